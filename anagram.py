@@ -0,0 +1,112 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Set
+from board_state import LETTER_CODES
+from language import normalize_word
+from tile import BLANK
+
+BINGO_LENGTH = 7
+# Key under which a node lists the words spelled by its signature
+WORDS = ''
+
+
+def signature(letters: Iterable[str]) -> str:
+    """Sorted uppercase letters: every anagram of a word shares its signature"""
+    return ''.join(sorted(letter.upper() for letter in letters))
+
+
+class AnagramIndex:
+    """Dictionary words in a trie over their sorted-letter signatures
+
+    A rack query walks the trie once, following an edge when the rack still
+    holds that letter or a wildcard (a blank or an unknown board letter) is
+    left to stand for it. Because signatures are sorted, a branch can be
+    dropped as soon as it passes a letter that every answer must contain.
+    The cost depends on the words reachable from the rack, not on the
+    number of rack permutations.
+    """
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.root: Dict[str, dict] = {}
+        self.word_count = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> bool:
+        """Index a word, returning False if it cannot be spelled with the tile set"""
+        word = normalize_word(word)
+        if not word or any(letter not in LETTER_CODES or letter == BLANK for letter in word):
+            return False
+        node = self.root
+        for letter in signature(word):
+            node = node.setdefault(letter, {})
+        words = node.setdefault(WORDS, [])
+        if word not in words:
+            words.append(word)
+            self.word_count += 1
+        return True
+
+    def anagrams(self, letters: Iterable[str]) -> List[str]:
+        """Words using exactly these letters"""
+        node = self.root
+        for letter in signature(letters):
+            node = node.get(letter)
+            if node is None:
+                return []
+        return list(node.get(WORDS, ()))
+
+    def formable(self, rack: Sequence[str], extra: int = 0, through: str = "",
+                 min_length: int = 2, use_all: bool = False) -> List[str]:
+        """Words formable from rack tiles, blanks included, plus up to extra board letters
+
+        Args:
+            rack: Rack letters, '*' for a blank
+            extra: Number of unknown board letters a word may also use
+            through: Board letters every word must contain
+            min_length: Shortest word to report
+            use_all: Only report words that use every rack tile (bingos)
+
+        Results are sorted longest first.
+        """
+        naturals = [letter.upper() for letter in rack if letter != BLANK]
+        blanks = len(rack) - len(naturals)
+        through = through.upper()
+        available = Counter(naturals) + Counter(through)
+        required = Counter(through)
+        if use_all:
+            required += Counter(naturals)
+            min_length = max(min_length, len(rack) + len(through))
+
+        found: Set[str] = set()
+
+        def walk(node: dict, depth: int, wildcards: int):
+            if depth >= min_length and WORDS in node and not +required:
+                found.update(node[WORDS])
+            for letter, child in node.items():
+                if letter == WORDS:
+                    continue
+                # Signatures only grow from here, so required letters before this one can never be used
+                if any(count and needed < letter for needed, count in required.items()):
+                    continue
+                if available[letter]:
+                    available[letter] -= 1
+                    was_required = required[letter] > 0
+                    if was_required:
+                        required[letter] -= 1
+                    walk(child, depth + 1, wildcards)
+                    if was_required:
+                        required[letter] += 1
+                    available[letter] += 1
+                elif wildcards:
+                    walk(child, depth + 1, wildcards - 1)
+
+        walk(self.root, 0, blanks + extra)
+        return sorted(found, key=lambda word: (-len(word), word))
+
+    def bingos(self, rack: Sequence[str], extra: int = 1) -> List[str]:
+        """Words that play a full rack, alone or through up to extra board letters"""
+        if len(rack) < BINGO_LENGTH:
+            return []
+        return self.formable(rack, extra, use_all=True)
+
+    def __len__(self) -> int:
+        return self.word_count
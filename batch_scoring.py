@@ -0,0 +1,145 @@
+from typing import Iterable, Tuple
+import numpy as np
+from board_state import BoardState, BOARD_SIZE, TILE_CODES, LETTER_VALUES
+from layout import BoardLayout
+
+LETTER_VALUE_TABLE = np.array(LETTER_VALUES, dtype=np.int32)
+
+MAX_TILES = 7
+
+
+def premium_matrices(layout: BoardLayout) -> Tuple[np.ndarray, np.ndarray]:
+    """A layout's letter and word multipliers as flat arrays, one entry per square"""
+    return (np.frombuffer(layout.letter_multipliers, dtype=np.uint8).astype(np.int32),
+            np.frombuffer(layout.word_multipliers, dtype=np.uint8).astype(np.int32))
+
+
+def pack_moves(moves: Iterable, size: int = BOARD_SIZE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert Move objects to the index arrays taken by BatchScorer.score
+
+    Returns squares and letter codes of shape (N, 7), padded with -1 and 0,
+    and a boolean array telling which moves are horizontal.
+    """
+    moves = list(moves)
+    squares = np.full((len(moves), MAX_TILES), -1, dtype=np.int32)
+    codes = np.zeros((len(moves), MAX_TILES), dtype=np.int32)
+    horizontal = np.zeros(len(moves), dtype=bool)
+    for i, move in enumerate(moves):
+        for j, ((row, col), letter) in enumerate(move.placements):
+            squares[i, j] = row * size + col
+            codes[i, j] = TILE_CODES[letter]
+        horizontal[i] = move.direction == 'horizontal'
+    return squares, codes, horizontal
+
+
+class BatchScorer:
+    """Scores many candidate placements on one board in a single vectorized pass
+
+    prepare() derives per-square sums of the tiles already on the board; the
+    candidates themselves are assumed legal (as produced by MoveGenerator).
+    """
+
+    def __init__(self, state: BoardState = None):
+        if state is not None:
+            self.prepare(state)
+
+    def prepare(self, state: BoardState):
+        """Precompute board-dependent sums; call again whenever the board changes"""
+        self.size = size = state.size
+        self.letter_multipliers, self.word_multipliers = premium_matrices(state.layout)
+        codes = np.frombuffer(bytes(state.cells), dtype=np.uint8).reshape(size, size)
+        occupied = codes > 0
+        values = LETTER_VALUE_TABLE[codes]
+
+        # Cumulative tile values along each row (horizontal) and down each column (vertical)
+        self.row_cumsum = np.cumsum(values, axis=1).ravel()
+        self.col_cumsum = np.cumsum(values, axis=0).ravel()
+
+        # Value and length of the run of tiles immediately before/after each square
+        self.before = {}
+        self.after = {}
+        for direction, axis in (('horizontal', 1), ('vertical', 0)):
+            before_sum, before_len = self._runs(values, occupied, axis, reverse=False)
+            after_sum, after_len = self._runs(values, occupied, axis, reverse=True)
+            self.before[direction] = (before_sum.ravel(), before_len.ravel())
+            self.after[direction] = (after_sum.ravel(), after_len.ravel())
+
+    @staticmethod
+    def _runs(values: np.ndarray, occupied: np.ndarray, axis: int, reverse: bool):
+        """Sum and length of the contiguous tiles ending just before each square along an axis"""
+        if axis == 0:
+            values, occupied = values.T, occupied.T
+        if reverse:
+            values, occupied = values[:, ::-1], occupied[:, ::-1]
+
+        run_sum = np.zeros_like(values)
+        run_len = np.zeros_like(values)
+        # At most size - 1 steps, each a whole-board vector operation
+        for pos in range(1, values.shape[1]):
+            prev = occupied[:, pos - 1]
+            run_sum[:, pos] = np.where(prev, run_sum[:, pos - 1] + values[:, pos - 1], 0)
+            run_len[:, pos] = np.where(prev, run_len[:, pos - 1] + 1, 0)
+
+        if reverse:
+            run_sum, run_len = run_sum[:, ::-1], run_len[:, ::-1]
+        if axis == 0:
+            run_sum, run_len = run_sum.T, run_len.T
+        return run_sum, run_len
+
+    def score(self, squares: np.ndarray, codes: np.ndarray, horizontal: np.ndarray) -> np.ndarray:
+        """Score every candidate, main word and cross-words included
+
+        Args:
+            squares: (N, K) flat square indices of the placed tiles, -1 for padding
+            codes: (N, K) board letter codes of the placed tiles
+            horizontal: (N,) True for across plays
+
+        Returns:
+            (N,) integer scores
+        """
+        size = self.size
+        valid = squares >= 0
+        sq = np.where(valid, squares, 0)
+        horizontal = horizontal.astype(bool)
+        h = horizontal[:, None]
+
+        letter_scores = np.where(valid, LETTER_VALUE_TABLE[codes] * self.letter_multipliers[sq], 0)
+        word_mult = np.where(valid, self.word_multipliers[sq], 1)
+        word_multiplier = word_mult.prod(axis=1)
+
+        # Extent of the placed tiles along their line
+        rows, cols = sq // size, sq % size
+        pos = np.where(h, cols, rows)
+        line = np.where(horizontal, rows[:, 0], cols[:, 0])
+        first = np.where(valid, pos, size).min(axis=1)
+        last = np.where(valid, pos, -1).max(axis=1)
+        first_sq = np.where(horizontal, line * size + first, first * size + line)
+        last_sq = np.where(horizontal, line * size + last, last * size + line)
+
+        # Tiles already on the board between, before and after the placed ones
+        between = np.where(horizontal,
+                           self.row_cumsum[last_sq] - self.row_cumsum[first_sq],
+                           self.col_cumsum[last_sq] - self.col_cumsum[first_sq])
+        before_sum = np.where(horizontal, self.before['horizontal'][0][first_sq], self.before['vertical'][0][first_sq])
+        before_len = np.where(horizontal, self.before['horizontal'][1][first_sq], self.before['vertical'][1][first_sq])
+        after_sum = np.where(horizontal, self.after['horizontal'][0][last_sq], self.after['vertical'][0][last_sq])
+        after_len = np.where(horizontal, self.after['horizontal'][1][last_sq], self.after['vertical'][1][last_sq])
+
+        main_len = last - first + 1 + before_len + after_len
+        main = (letter_scores.sum(axis=1) + between + before_sum + after_sum) * word_multiplier
+        main = np.where(main_len > 1, main, 0)
+
+        # Perpendicular words through each placed tile
+        cross_sum = np.where(h,
+                             self.before['vertical'][0][sq] + self.after['vertical'][0][sq],
+                             self.before['horizontal'][0][sq] + self.after['horizontal'][0][sq])
+        cross_len = np.where(h,
+                             self.before['vertical'][1][sq] + self.after['vertical'][1][sq],
+                             self.before['horizontal'][1][sq] + self.after['horizontal'][1][sq])
+        cross = np.where(valid & (cross_len > 0), (cross_sum + letter_scores) * word_mult, 0)
+
+        return main + cross.sum(axis=1)
+
+    def score_moves(self, moves: Iterable) -> np.ndarray:
+        """Convenience wrapper scoring Move objects"""
+        return self.score(*pack_moves(moves, self.size))
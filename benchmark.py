@@ -0,0 +1,237 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+from board_state import BoardState
+from headless import HeadlessGame, RACK_SIZE, greedy_policy
+from movegen import MoveGenerator
+from tile import BLANK, TileSystem
+from utils import load_dictionary, load_compiled_dictionary
+
+POSITIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_positions.json')
+
+# Approximate tile counts at which the generated positions are captured; past
+# about 85 tiles the bag is empty and racks run down, so few moves are left
+DENSITIES = {'opening': 1, 'midgame': 40, 'full': 80}
+
+
+def generate_positions(dict_file: str, seed: int = 2024, games: int = 10) -> Dict[str, Dict]:
+    """Play seeded greedy games and capture boards at opening, midgame and late density
+
+    Only full racks without a blank are captured, since blanks multiply the
+    move count several times over and would make the positions atypical.
+    """
+    dictionary = load_compiled_dictionary(dict_file)
+    generator = MoveGenerator.from_dictionary(dictionary)
+    positions = {}
+    for attempt in range(games):
+        game = HeadlessGame(generator, [greedy_policy, greedy_policy], dictionary, seed + attempt)
+        captured = {}
+        while not game.finished:
+            rack = game.racks[game.to_move]
+            for name, tiles in DENSITIES.items():
+                if (name not in captured and game.state.tile_count >= tiles and
+                        len(rack) == RACK_SIZE and BLANK not in rack):
+                    moves = generator.generate(game.state, rack)
+                    captured[name] = {
+                        'tiles': [[row, col, letter] for (row, col), letter in game.state.get_tiles().items()],
+                        'rack': list(rack),
+                        'moves': [[[row, col, letter] for (row, col), letter in move.placements]
+                                  for move in moves[:200]],
+                    }
+            game.play_turn()
+        # Keep the position with the most candidate moves for each stage
+        for name, position in captured.items():
+            if name not in positions or len(position['moves']) > len(positions[name]['moves']):
+                positions[name] = position
+    return positions
+
+
+def load_positions(dict_file: str) -> Dict[str, Dict]:
+    """Load the bundled positions, generating them if the file is missing"""
+    if os.path.exists(POSITIONS_FILE):
+        with open(POSITIONS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return generate_positions(dict_file)
+
+
+def build_state(position: Dict, dictionary) -> BoardState:
+    state = BoardState(dictionary)
+    state.commit_move({(row, col): letter for row, col, letter in position['tiles']})
+    return state
+
+
+def measure(operation: Callable[[], object], batch: int = 100, samples: int = 200,
+            max_seconds: float = 2.0) -> Dict[str, float]:
+    """Time an operation in batches and report throughput and per-call latency percentiles"""
+    latencies = []
+    deadline = time.perf_counter() + max_seconds
+    for _ in range(samples):
+        start = time.perf_counter_ns()
+        for _ in range(batch):
+            operation()
+        latencies.append((time.perf_counter_ns() - start) / batch)
+        if time.perf_counter() > deadline and len(latencies) >= 10:
+            break
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] / 1000.0
+
+    mean_ns = sum(latencies) / len(latencies)
+    return {
+        'ops_per_sec': round(1e9 / mean_ns, 1) if mean_ns else 0.0,
+        'p50_us': round(percentile(0.50), 3),
+        'p90_us': round(percentile(0.90), 3),
+        'p99_us': round(percentile(0.99), 3),
+        'samples': len(latencies),
+    }
+
+
+def cycle(items: List) -> Callable[[], object]:
+    """Return a function yielding the items round-robin"""
+    index = [0]
+
+    def next_item():
+        item = items[index[0] % len(items)]
+        index[0] += 1
+        return item
+    return next_item
+
+
+def run_benchmarks(dict_file: str, only: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Run every benchmark, or only those whose name contains the filter"""
+    word_trie = load_dictionary(dict_file)
+    compiled = load_compiled_dictionary(dict_file)
+    positions = load_positions(dict_file)
+    generator = MoveGenerator.from_dictionary(compiled)
+    cases: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+    for name, position in positions.items():
+        state = build_state(position, word_trie)
+        moves = [{(row, col): letter for row, col, letter in move} for move in position['moves']]
+        squares = [(row, col) for row, col, _ in position['tiles']]
+        rack = position['rack']
+
+        def validate(state=state, moves=moves):
+            next_move = cycle(moves)
+            return lambda: state.validate_move(next_move())
+
+        def word_at(state=state, squares=squares):
+            next_square = cycle([(row, col, direction) for row, col in squares
+                                 for direction in ('horizontal', 'vertical')])
+            return lambda: state.get_word_at_position(*next_square())
+
+        def generate(state=state, rack=rack):
+            generator.attach(state)
+            return lambda: generator.generate(state, rack)
+
+        if moves:
+            cases[f'validate_move[{name}]'] = validate
+        cases[f'get_word_at_position[{name}]'] = word_at
+        cases[f'movegen.generate[{name}]'] = generate
+
+    words = sorted(word_trie)
+    probes = words[::7] + [word + 'x' for word in words[::13]]
+
+    def is_valid_word(dictionary):
+        state = BoardState(dictionary)
+        next_word = cycle(probes)
+        return lambda: state.is_valid_word(next_word())
+
+    cases['is_valid_word[trie]'] = lambda: is_valid_word(word_trie)
+    cases['is_valid_word[dawg]'] = lambda: is_valid_word(compiled)
+    cases['load_dictionary'] = lambda: (lambda: load_dictionary(dict_file))
+    cases['load_compiled_dictionary'] = lambda: (lambda: load_compiled_dictionary(dict_file))
+
+    def draw_return():
+        tile_system = TileSystem(seed=0)
+
+        def operation():
+            tiles = tile_system.draw_tiles(7)
+            tile_system.return_tiles(tiles)
+        return operation
+
+    def draw_return_letters():
+        tile_system = TileSystem(seed=0)
+
+        def operation():
+            tile_system.return_letters(tile_system.draw_letters(7))
+        return operation
+
+    def snapshot_restore():
+        tile_system = TileSystem(seed=0)
+        snapshot = tile_system.snapshot()
+        return lambda: tile_system.restore(snapshot)
+
+    cases['TileSystem.draw_tiles+return_tiles'] = draw_return
+    cases['TileSystem.draw_letters+return_letters'] = draw_return_letters
+    cases['TileSystem.snapshot+restore'] = snapshot_restore
+
+    results = {}
+    for name, setup in cases.items():
+        if only and only not in name:
+            continue
+        batch = 1 if name.startswith(('load_', 'movegen')) else 100
+        results[name] = measure(setup(), batch=batch)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """List benchmarks whose throughput dropped by more than threshold versus the baseline"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous['ops_per_sec']:
+            continue
+        change = result['ops_per_sec'] / previous['ops_per_sec'] - 1.0
+        if change < -threshold:
+            regressions.append(f"{name}: {previous['ops_per_sec']:.1f} -> {result['ops_per_sec']:.1f} ops/sec "
+                               f"({change:+.1%})")
+    return regressions
+
+
+def main():
+    """Entry point for the benchmark suite"""
+    parser = argparse.ArgumentParser(description="Benchmark the rules, dictionary and bag hot paths")
+    parser.add_argument('dict_file', help="Dictionary file, one word per line")
+    parser.add_argument('--only', help="Run only benchmarks whose name contains this text")
+    parser.add_argument('--save', help="Write results as a JSON baseline")
+    parser.add_argument('--compare', help="Baseline JSON to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="Allowed throughput drop before flagging a regression (default 0.15)")
+    parser.add_argument('--generate-positions', action='store_true',
+                        help=f"Regenerate {os.path.basename(POSITIONS_FILE)} and exit")
+    args = parser.parse_args()
+
+    if args.generate_positions:
+        with open(POSITIONS_FILE, 'w', encoding='utf-8') as f:
+            json.dump(generate_positions(args.dict_file), f, ensure_ascii=False)
+        return
+
+    results = run_benchmarks(args.dict_file, args.only)
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}}  {'ops/sec':>12}  {'p50 us':>10}  {'p90 us':>10}  {'p99 us':>10}")
+    for name, result in results.items():
+        print(f"{name:<{width}}  {result['ops_per_sec']:>12.1f}  {result['p50_us']:>10.3f}  "
+              f"{result['p90_us']:>10.3f}  {result['p99_us']:>10.3f}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
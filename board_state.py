@@ -0,0 +1,385 @@
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from tile import TileSystem, BLANK
+from language import LANGUAGE
+from layout import BoardLayout, STANDARD
+
+# The standard board, for code that only ever plays on it
+BOARD_SIZE = STANDARD.size
+CENTER = STANDARD.center
+SPECIAL_SQUARES = STANDARD.premiums
+LETTER_MULTIPLIERS = STANDARD.letter_multipliers
+WORD_MULTIPLIERS = STANDARD.word_multipliers
+BONUS_TYPES = STANDARD.bonus_types
+SQUARE_KEYS = STANDARD.square_keys
+
+# Letters are stored on the board as small integer codes, 0 meaning empty.
+# A blank played as a letter is written in lowercase and stored with BLANK_FLAG set.
+ALPHABET = list(TileSystem.TILE_DISTRIBUTION)
+LETTER_CODES = {letter: code for code, letter in enumerate(ALPHABET, start=1)}
+BLANK_FLAG = 0x80
+CODE_MASK = 0x7F
+TILE_CODES = dict(LETTER_CODES)
+TILE_CODES.update({letter.lower(): code | BLANK_FLAG for letter, code in LETTER_CODES.items() if letter != BLANK})
+# Codes of letters as spelled in words: either case, with variant spellings folded in
+WORD_CODES = {spelling: code for letter, code in LETTER_CODES.items() if letter != BLANK
+              for spelling in (letter, letter.lower())}
+for _variant, _letter in LANGUAGE.variants.items():
+    WORD_CODES[_variant] = WORD_CODES[_variant.lower()] = LETTER_CODES[_letter]
+CODE_LETTERS = [""] * 256
+LETTER_VALUES = [0] * 256
+for _letter, _code in TILE_CODES.items():
+    CODE_LETTERS[_code] = _letter
+    LETTER_VALUES[_code] = 0 if _code & BLANK_FLAG else TileSystem.TILE_DISTRIBUTION[_letter]['value']
+
+
+class BoardState:
+    """Headless board model: letters, placement rules and scoring without any Qt widgets
+
+    Squares are flat indices row * size + col on the board's layout.
+    """
+
+    def __init__(self, dictionary: Optional[Set[str]] = None, layout: BoardLayout = STANDARD):
+        self.dictionary = dictionary
+        self.layout = layout
+        self.size = layout.size
+        self.square_keys = layout.square_keys
+        self.cells = bytearray(layout.squares)
+        self.tile_count = 0
+        # The layout's salt XOR square_keys for every placed tile, kept up to date incrementally
+        self.zobrist = layout.key_salt
+        self.cross_checks = None  # Optional movegen.CrossChecks kept in sync by commit_move
+
+    @classmethod
+    def from_snapshot(cls, cells: bytes, dictionary: Optional[Set[str]] = None,
+                      layout: BoardLayout = STANDARD) -> 'BoardState':
+        """Rebuild a board from snapshot(), e.g. on a worker thread"""
+        state = cls(dictionary, layout)
+        state.cells[:] = cells
+        for index, code in enumerate(cells):
+            if code:
+                state.tile_count += 1
+                state.zobrist ^= state.square_keys[index << 8 | code]
+        return state
+
+    def snapshot(self) -> bytes:
+        """Immutable copy of the letters on the board"""
+        return bytes(self.cells)
+
+    @property
+    def first_move(self) -> bool:
+        return self.tile_count == 0
+
+    def get_letter(self, row: int, col: int) -> str:
+        """Get the letter at a position, or an empty string"""
+        return CODE_LETTERS[self.cells[row * self.size + col]]
+
+    def is_empty(self, row: int, col: int) -> bool:
+        return not self.cells[row * self.size + col]
+
+    def get_bonus_type(self, row: int, col: int) -> str:
+        return self.layout.bonus_types[row * self.size + col]
+
+    def place_letter(self, row: int, col: int, letter: str):
+        """Put a letter on an empty square; lowercase letters are blanks"""
+        index = self.layout.index(row, col)
+        if self.cells[index]:
+            raise ValueError(f"Square {(row, col)} is already occupied")
+        code = TILE_CODES[letter]
+        self.cells[index] = code
+        self.tile_count += 1
+        self.zobrist ^= self.square_keys[index << 8 | code]
+
+    def remove_letter(self, row: int, col: int) -> str:
+        """Take a letter off the board and return it"""
+        index = row * self.size + col
+        code = self.cells[index]
+        if code:
+            self.cells[index] = 0
+            self.tile_count -= 1
+            self.zobrist ^= self.square_keys[index << 8 | code]
+        return CODE_LETTERS[code]
+
+    def commit_move(self, placements: Dict[Tuple[int, int], str]):
+        """Permanently place the tiles of a validated move"""
+        for (row, col), letter in placements.items():
+            self.place_letter(row, col, letter)
+        if self.cross_checks is not None:
+            self.cross_checks.update(placements)
+
+    def retract_move(self, positions: Iterable[Tuple[int, int]]):
+        """Take the tiles of a committed move back off the board, e.g. to undo it"""
+        positions = list(positions)
+        for row, col in positions:
+            self.remove_letter(row, col)
+        if self.cross_checks is not None:
+            self.cross_checks.update(positions)
+
+    def clear(self):
+        """Remove all tiles from the board"""
+        self.cells[:] = bytes(self.layout.squares)
+        self.tile_count = 0
+        self.zobrist = self.layout.key_salt
+        if self.cross_checks is not None:
+            self.cross_checks.rebuild()
+
+    def get_tiles(self) -> Dict[Tuple[int, int], str]:
+        """Get all placed tiles keyed by position"""
+        cells = self.cells
+        size = self.size
+        return {divmod(index, size): CODE_LETTERS[code]
+                for index, code in enumerate(cells) if code}
+
+    @contextmanager
+    def overlay(self, placements: Dict[Tuple[int, int], str]) -> Iterator[None]:
+        """Temporarily put uncommitted tiles on the board"""
+        cells = self.cells
+        size = self.size
+        indices = []
+        try:
+            for (row, col), letter in placements.items():
+                if not (0 <= row < size and 0 <= col < size):
+                    raise ValueError(f"Square {(row, col)} is off the board")
+                index = row * size + col
+                if cells[index]:
+                    raise ValueError(f"Square {(row, col)} is already occupied")
+                cells[index] = TILE_CODES[letter]
+                indices.append(index)
+            yield
+        finally:
+            for index in indices:
+                cells[index] = 0
+
+    def get_word_at_position(self, row: int, col: int, direction: str) -> Tuple[str, List[Tuple[int, int]]]:
+        """Get word and positions through given position in given direction"""
+        cells = self.cells
+        size = self.size
+        step = 1 if direction == 'horizontal' else size
+        index = row * size + col
+        line_start = row * size if direction == 'horizontal' else col
+        line_end = line_start + step * (size - 1)
+
+        # Walk back to the start of the word
+        while index > line_start and cells[index - step]:
+            index -= step
+
+        # Read forward to get complete word
+        word = ""
+        positions = []
+        while index <= line_end and cells[index]:
+            word += CODE_LETTERS[cells[index]]
+            positions.append(divmod(index, size))
+            index += step
+
+        return word, positions
+
+    def validate_move(self, placements: Dict[Tuple[int, int], str]) -> Optional[int]:
+        """Validate a move of uncommitted tiles and return its score, None if invalid"""
+        if not placements:
+            return None
+
+        with self.overlay(placements):
+            words = self._words_formed(placements)
+            if words is None:
+                return None
+
+            score = 0
+            for word, positions in words:
+                if not self.is_valid_word(word):
+                    return None
+                score += self.calculate_word_score(word, positions, placements)
+            return score
+
+    def _words_formed(self, placements: Dict[Tuple[int, int], str],
+                      cross_word=None) -> Optional[List[Tuple[str, List[Tuple[int, int]]]]]:
+        """List the words made by tiles already overlaid on the board, None if placement is illegal
+
+        cross_word, if given, replaces get_word_at_position for the
+        perpendicular words so callers can serve them from a cache.
+        """
+        cells = self.cells
+        size = self.size
+        if cross_word is None:
+            cross_word = self.get_word_at_position
+
+        # Check if tiles are in line
+        rows = {pos[0] for pos in placements}
+        cols = {pos[1] for pos in placements}
+
+        if len(rows) == 1:
+            direction = 'horizontal'
+            fixed_coord = next(iter(rows))
+            var_coords = sorted(cols)
+        elif len(cols) == 1:
+            direction = 'vertical'
+            fixed_coord = next(iter(cols))
+            var_coords = sorted(rows)
+        else:
+            return None  # Tiles not in line
+
+        # Check continuity
+        for i in range(var_coords[0], var_coords[-1] + 1):
+            row, col = (fixed_coord, i) if direction == 'horizontal' else (i, fixed_coord)
+            if not cells[row * size + col]:
+                return None  # Gap in word
+
+        # Get main word
+        if direction == 'horizontal':
+            main_word, positions = self.get_word_at_position(fixed_coord, var_coords[0], 'horizontal')
+        else:
+            main_word, positions = self.get_word_at_position(var_coords[0], fixed_coord, 'vertical')
+
+        # A single tile may form its word in either direction
+        if len(placements) == 1 and len(main_word) < 2:
+            direction = 'vertical'
+            main_word, positions = self.get_word_at_position(fixed_coord, var_coords[0], 'vertical')
+
+        if len(main_word) < 2:
+            return None  # Words must be at least two letters long
+
+        # Check if first move touches center
+        if self.first_move:
+            if self.layout.center not in positions:
+                return None
+        # After first move, must connect to existing tiles
+        elif len(positions) == len(placements):
+            neighbours = self.layout.neighbours
+            new_squares = {row * size + col for row, col in placements}
+            if not any(cells[n] and n not in new_squares
+                       for index in new_squares for n in neighbours[index]):
+                return None  # Word must connect to existing tiles
+
+        words = [(main_word, positions)]
+
+        # Check for perpendicular words formed
+        cross_direction = 'vertical' if direction == 'horizontal' else 'horizontal'
+        for row, col in placements:
+            perp_word, perp_pos = cross_word(row, col, cross_direction)
+            if len(perp_word) > 1:
+                words.append((perp_word, perp_pos))
+
+        return words
+
+    def words_formed(self, placements: Dict[Tuple[int, int], str]) -> Optional[List[Tuple[str, List[Tuple[int, int]]]]]:
+        """List the words a move would make, None if the tiles are placed illegally"""
+        if not placements:
+            return None
+        with self.overlay(placements):
+            return self._words_formed(placements)
+
+    def is_valid_word(self, word: str) -> bool:
+        """Check if word is in dictionary; dictionaries accept either case and diacritic encoding"""
+        return word in self.dictionary
+
+    def calculate_word_score(self, word: str, positions: List[Tuple[int, int]],
+                             new_positions) -> int:
+        """Calculate score for a word, applying premiums only under newly placed tiles"""
+        cells = self.cells
+        size = self.size
+        letter_multipliers = self.layout.letter_multipliers
+        word_multipliers = self.layout.word_multipliers
+        word_multiplier = 1
+        word_score = 0
+
+        for row, col in positions:
+            index = row * size + col
+            letter_score = LETTER_VALUES[cells[index]]
+            if (row, col) in new_positions:
+                letter_score *= letter_multipliers[index]
+                word_multiplier *= word_multipliers[index]
+            word_score += letter_score
+
+        return word_score * word_multiplier
+
+
+class PreviewResult(NamedTuple):
+    """Outcome of evaluating a partly placed move"""
+    score: Optional[int]
+    words: List[str]
+    message: str
+
+
+class MovePreview:
+    """Evaluates a move incrementally while its tiles are placed and removed
+
+    Perpendicular words are cached per placed square and direction, and a
+    change only invalidates the cached words whose line passes through the
+    changed square. Word validity and word scores are memoized by their
+    letters and squares, so re-evaluating after each click only rescans the
+    main line.
+    """
+
+    def __init__(self, state: BoardState):
+        self.state = state
+        self.placements: Dict[Tuple[int, int], str] = {}
+        self._cross_words: Dict[Tuple[int, int, str], Tuple[str, List[Tuple[int, int]]]] = {}
+        self._valid_words: Dict[str, bool] = {}
+        self._word_scores: Dict[Tuple, int] = {}
+        self.result = PreviewResult(None, [], "")
+
+    def add(self, row: int, col: int, letter: str) -> PreviewResult:
+        """Put a tile of the move down and re-evaluate"""
+        self.placements[(row, col)] = letter
+        self._invalidate(row, col)
+        return self.evaluate()
+
+    def remove(self, row: int, col: int) -> PreviewResult:
+        """Take a tile of the move back and re-evaluate"""
+        self.placements.pop((row, col), None)
+        self._invalidate(row, col)
+        return self.evaluate()
+
+    def clear(self):
+        """Forget the current move, e.g. after it was confirmed or cancelled"""
+        self.placements = {}
+        self._cross_words.clear()
+        self._word_scores.clear()
+        self.result = PreviewResult(None, [], "")
+
+    def _invalidate(self, row: int, col: int):
+        """Drop cached perpendicular words whose line runs through the changed square"""
+        stale = [key for key in self._cross_words
+                 if (key[2] == 'vertical' and key[1] == col) or (key[2] == 'horizontal' and key[0] == row)]
+        for key in stale:
+            del self._cross_words[key]
+
+    def _cross_word(self, row: int, col: int, direction: str) -> Tuple[str, List[Tuple[int, int]]]:
+        key = (row, col, direction)
+        cached = self._cross_words.get(key)
+        if cached is None:
+            cached = self._cross_words[key] = self.state.get_word_at_position(row, col, direction)
+        return cached
+
+    def _is_valid(self, word: str) -> bool:
+        valid = self._valid_words.get(word)
+        if valid is None:
+            valid = self._valid_words[word] = self.state.is_valid_word(word)
+        return valid
+
+    def evaluate(self) -> PreviewResult:
+        """Score the tiles placed so far"""
+        placements = self.placements
+        if not placements:
+            self.result = PreviewResult(None, [], "")
+            return self.result
+
+        state = self.state
+        with state.overlay(placements):
+            words = state._words_formed(placements, self._cross_word)
+            if words is None:
+                self.result = PreviewResult(None, [], "Tiles must form one connected line")
+                return self.result
+
+            score = 0
+            for word, positions in words:
+                if not self._is_valid(word):
+                    self.result = PreviewResult(None, [w for w, _ in words], f"{word} is not in the dictionary")
+                    return self.result
+                key = (word, tuple(positions), tuple(pos for pos in positions if pos in placements))
+                word_score = self._word_scores.get(key)
+                if word_score is None:
+                    word_score = self._word_scores[key] = state.calculate_word_score(word, positions, placements)
+                score += word_score
+
+        self.result = PreviewResult(score, [w for w, _ in words], f"{score} points")
+        return self.result
@@ -0,0 +1,118 @@
+from typing import Dict, Iterable, Optional, Tuple
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtCore import Qt, QRect, QSize, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QFont, QPen
+from board_state import BoardState
+
+SQUARE_SIZE = 40
+SQUARE_PITCH = SQUARE_SIZE + 1  # One pixel gap between squares
+
+BONUS_COLORS = {
+    'QW': "#c0392b",  # Dark red for Quadruple Word
+    'TW': "#ff6b6b",  # Red for Triple Word
+    'DW': "#ffb6b9",  # Pink for Double Word
+    'TL': "#4ecdc4",  # Teal for Triple Letter
+    'QL': "#2e86ab",  # Blue for Quadruple Letter
+    'DL': "#96ceb4",  # Light green for Double Letter
+    '': "white",
+}
+SELECTED_COLOR = "#87CEFA"  # Light blue for the selected square
+PENDING_COLOR = "#1a4d8f"  # Letters of the move being placed
+
+
+class BoardView(QWidget):
+    """Paints the whole board from a BoardState in one widget
+
+    Letters come from the model plus the tiles of the move being placed, so
+    nothing is copied into per-square widgets. Changes repaint only the
+    squares they touch, and clicks are hit-tested from coordinates.
+    """
+
+    square_clicked = pyqtSignal(int, int)  # Row and column of a left click
+
+    def __init__(self, state: BoardState, pending: Dict[Tuple[int, int], str], parent=None):
+        super().__init__(parent)
+        self.state = state
+        self.pending = pending  # Tiles of the move being placed, owned by the board
+        self.selected: Optional[Tuple[int, int]] = None
+        self.board_size = state.size
+        self.bonus_types = state.layout.bonus_types
+        self.colors = [QColor(BONUS_COLORS[bonus_type]) for bonus_type in self.bonus_types]
+        self.selected_color = QColor(SELECTED_COLOR)
+        self.pending_pen = QPen(QColor(PENDING_COLOR))
+        self.letter_font = QFont('Arial', 14, QFont.Bold)
+        self.bonus_font = QFont('Arial', 8)
+        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def sizeHint(self) -> QSize:
+        side = self.board_size * SQUARE_PITCH - 1
+        return QSize(side, side)
+
+    def minimumSizeHint(self) -> QSize:
+        return self.sizeHint()
+
+    @staticmethod
+    def square_rect(row: int, col: int) -> QRect:
+        return QRect(col * SQUARE_PITCH, row * SQUARE_PITCH, SQUARE_SIZE, SQUARE_SIZE)
+
+    def square_at(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """The square under a point, None for the gaps and outside the grid"""
+        row, row_offset = divmod(y, SQUARE_PITCH)
+        col, col_offset = divmod(x, SQUARE_PITCH)
+        if (0 <= row < self.board_size and 0 <= col < self.board_size and
+                row_offset < SQUARE_SIZE and col_offset < SQUARE_SIZE):
+            return row, col
+        return None
+
+    def refresh_squares(self, positions: Iterable[Tuple[int, int]]):
+        """Schedule a repaint of just these squares"""
+        for row, col in positions:
+            self.update(self.square_rect(row, col))
+
+    def set_selected(self, position: Optional[Tuple[int, int]]):
+        """Highlight one empty square, or none"""
+        previous, self.selected = self.selected, position
+        self.refresh_squares(pos for pos in (previous, position) if pos is not None)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        dirty = event.rect()
+        painter.fillRect(dirty, self.palette().window())
+
+        first_row = max(0, dirty.top() // SQUARE_PITCH)
+        last_row = min(self.board_size - 1, dirty.bottom() // SQUARE_PITCH)
+        first_col = max(0, dirty.left() // SQUARE_PITCH)
+        last_col = min(self.board_size - 1, dirty.right() // SQUARE_PITCH)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                self.paint_square(painter, row, col)
+        painter.end()
+
+    def paint_square(self, painter: QPainter, row: int, col: int):
+        rect = self.square_rect(row, col)
+        index = row * self.board_size + col
+        color = self.selected_color if self.selected == (row, col) else self.colors[index]
+        painter.fillRect(rect, color)
+        painter.setPen(Qt.black)
+        painter.drawRect(rect.adjusted(0, 0, -1, -1))
+
+        bonus_type = self.bonus_types[index]
+        if bonus_type:
+            painter.setFont(self.bonus_font)
+            painter.drawText(rect.adjusted(0, 1, 0, -SQUARE_SIZE // 2), Qt.AlignCenter, bonus_type)
+
+        letter = self.pending.get((row, col))
+        if letter:
+            painter.setPen(self.pending_pen)
+        else:
+            letter = self.state.get_letter(row, col)
+        if letter:
+            painter.setFont(self.letter_font)
+            painter.drawText(rect.adjusted(0, SQUARE_SIZE // 3, 0, 0), Qt.AlignCenter, letter)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            square = self.square_at(event.x(), event.y())
+            if square is not None:
+                self.square_clicked.emit(*square)
@@ -0,0 +1,208 @@
+import threading
+import traceback
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Set, Tuple
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from anagram import AnagramIndex
+from board_state import BoardState
+from dawg import Dawg
+from endgame import EndgameSolver
+from exchange import ExchangeAdvice, ExchangeAdvisor
+from layout import BoardLayout, STANDARD
+from leaves import default_table
+from movegen import Move, MoveGenerator
+from startup import StartupTrace
+from utils import open_compiled_dictionary
+
+
+class Cancelled(Exception):
+    """Raised inside a task that noticed its cancellation"""
+
+
+class PositionSnapshot(NamedTuple):
+    """Everything a background search needs, copied so the GUI can keep changing"""
+    cells: bytes  # BoardState.snapshot()
+    rack: Tuple[str, ...]
+    opponent_rack: Optional[Tuple[str, ...]]  # Known only against the computer
+    bag: int  # Tiles left in the bag
+    layout: BoardLayout = STANDARD
+
+
+class MoveChoice(NamedTuple):
+    move: Optional[Move]  # None when there is no play, or passing is best in the endgame
+    endgame: bool  # True when the move comes from the endgame solver
+    bingos: Tuple[str, ...] = ()  # Seven-letter words on the rack, filled in for hints
+
+
+# The anagram index of the last dictionary hinted with; only the worker thread touches it
+_anagram_cache: Dict[str, object] = {'dictionary': None, 'index': None}
+
+
+def anagram_index(dictionary: Iterable[str]) -> AnagramIndex:
+    """The dictionary's anagram index, built on first use and kept while the dictionary is the same"""
+    if _anagram_cache['dictionary'] is not dictionary:
+        _anagram_cache['index'] = AnagramIndex(dictionary)
+        _anagram_cache['dictionary'] = dictionary
+    return _anagram_cache['index']
+
+
+def choose_move(generator: MoveGenerator, snapshot: PositionSnapshot, token: threading.Event,
+                progress: Callable[[str], None]) -> MoveChoice:
+    """Best move for the snapshot's rack: the solved line once the bag is empty, else the top score"""
+    state = BoardState.from_snapshot(snapshot.cells, layout=snapshot.layout)
+    if snapshot.bag == 0 and snapshot.opponent_rack is not None:
+        progress("Solving endgame")
+        result = EndgameSolver(generator).solve(
+            state, (snapshot.rack, snapshot.opponent_rack), cancelled=token.is_set,
+            progress=lambda result: progress(f"Endgame searched {result.depth} moves ahead"))
+        if token.is_set():
+            raise Cancelled()
+        return MoveChoice(result.best, True)
+
+    progress("Generating moves")
+    move = generator.best_move(state, snapshot.rack)
+    if token.is_set():
+        raise Cancelled()
+    return MoveChoice(move, False)
+
+
+def find_hint(generator: MoveGenerator, dictionary: Iterable[str], snapshot: PositionSnapshot,
+              token: threading.Event, progress: Callable[[str], None]) -> MoveChoice:
+    """choose_move for the player, plus the bingos their rack spells"""
+    choice = choose_move(generator, snapshot, token, progress)
+    progress("Looking for bingos")
+    bingos = anagram_index(dictionary).bingos(snapshot.rack)
+    if token.is_set():
+        raise Cancelled()
+    return choice._replace(bingos=tuple(bingos))
+
+
+def advise_exchange(generator: MoveGenerator, snapshot: PositionSnapshot, token: threading.Event,
+                    progress: Callable[[str], None]) -> ExchangeAdvice:
+    """Weigh every exchange of the snapshot's rack against its best plays by simulating the redraws"""
+    progress("Weighing exchanges...")
+    state = BoardState.from_snapshot(snapshot.cells, layout=snapshot.layout)
+    advice = ExchangeAdvisor(generator, default_table()).advise(state, snapshot.rack, snapshot.bag,
+                                                                cancelled=token.is_set)
+    if token.is_set():
+        raise Cancelled()
+    return advice
+
+
+def load_lexicon(dict_file: str, trace: Optional[StartupTrace], token: threading.Event,
+                 progress: Callable[[str], None]) -> Dawg:
+    """Open the compiled dictionary, trusting an up-to-date cache without rehashing the word list
+
+    Errors propagate, so the task fails with the actual reason; an empty
+    word list is returned as is.
+    """
+    progress("Loading dictionary...")
+    if trace is None:
+        return open_compiled_dictionary(dict_file, verify=False)
+    with trace.phase("dictionary"):
+        return open_compiled_dictionary(dict_file, verify=False)
+
+
+class TaskSignals(QObject):
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    done = pyqtSignal()  # Always emitted last, cancelled or not
+
+
+class ComputeTask(QRunnable):
+    """Runs function(*args, token=..., progress=...) on a pool thread
+
+    The function should check token.is_set() (or raise Cancelled) at
+    convenient points; results of a cancelled task are never delivered.
+    """
+
+    def __init__(self, function: Callable, *args):
+        super().__init__()
+        self.setAutoDelete(False)  # The service keeps the Python reference until it finishes
+        self.function = function
+        self.args = args
+        self.token = threading.Event()
+        self.signals = TaskSignals()
+
+    def cancel(self):
+        self.token.set()
+
+    def run(self):
+        try:
+            if self.token.is_set():
+                return
+            result = self.function(*self.args, token=self.token, progress=self.signals.progress.emit)
+            if not self.token.is_set():
+                self.signals.finished.emit(result)
+        except Cancelled:
+            pass
+        except Exception:
+            self.signals.failed.emit(traceback.format_exc())
+        finally:
+            self.signals.done.emit()
+
+
+class ComputeService(QObject):
+    """Background analysis for the GUI on a single worker thread
+
+    Tasks are submitted under a kind such as 'hint' or 'computer'. A new
+    task cancels the running or queued task of the same kind, and results
+    arrive on the GUI thread through the signals below, tagged with the kind.
+    One worker thread keeps the shared move generator and its tables free
+    of concurrent access.
+    """
+
+    progress = pyqtSignal(str, str)  # kind, message
+    finished = pyqtSignal(str, object)  # kind, result
+    failed = pyqtSignal(str, str)  # kind, traceback
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.tasks: Dict[str, ComputeTask] = {}  # Current task per kind
+        self.active: Set[ComputeTask] = set()  # Submitted tasks not yet done, cancelled ones included
+
+    def submit(self, kind: str, function: Callable, *args) -> ComputeTask:
+        self.cancel(kind)
+        task = ComputeTask(function, *args)
+        self.tasks[kind] = task
+        self.active.add(task)
+        task.signals.done.connect(lambda: self.active.discard(task))
+        task.signals.progress.connect(lambda message: self._on_progress(kind, task, message))
+        task.signals.finished.connect(lambda result: self._on_finished(kind, task, result))
+        task.signals.failed.connect(lambda error: self._on_failed(kind, task, error))
+        self.pool.start(task)
+        return task
+
+    def cancel(self, kind: Optional[str] = None):
+        """Cancel the task of one kind, or every task"""
+        kinds = [kind] if kind is not None else list(self.tasks)
+        for name in kinds:
+            task = self.tasks.pop(name, None)
+            if task is not None:
+                task.cancel()
+
+    def is_busy(self, kind: str) -> bool:
+        return kind in self.tasks
+
+    def wait(self, timeout_ms: int = -1) -> bool:
+        """Block until queued tasks are done; their signals still need the event loop"""
+        return self.pool.waitForDone(timeout_ms)
+
+    def _current(self, kind: str, task: ComputeTask) -> bool:
+        return self.tasks.get(kind) is task and not task.token.is_set()
+
+    def _on_progress(self, kind: str, task: ComputeTask, message: str):
+        if self._current(kind, task):
+            self.progress.emit(kind, message)
+
+    def _on_finished(self, kind: str, task: ComputeTask, result: object):
+        if self._current(kind, task):
+            del self.tasks[kind]
+            self.finished.emit(kind, result)
+
+    def _on_failed(self, kind: str, task: ComputeTask, error: str):
+        if self._current(kind, task):
+            del self.tasks[kind]
+            self.failed.emit(kind, error)
@@ -0,0 +1,317 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from board_state import ALPHABET, CODE_LETTERS
+from language import LANGUAGE
+from lexicon import encode_word, match_pattern
+
+# Compiled file layout: a fixed header followed by a flat array of 32-bit edges.
+#   bits 0-5   letter code (the GADDAG separator uses SEPARATOR)
+#   bit 6      the child node ends a word
+#   bit 7      last edge of its node
+#   bits 8-31  index of the child's first edge, 0 if the child has no edges
+# Edge 0 is a dummy so that index 0 can mean "no edges".
+MAGIC = b'SCDAWG01'
+HEADER = struct.Struct('<8s32sIIII')  # magic, source digest, words, edges, dawg root, gaddag root
+SEPARATOR = len(ALPHABET) + 1
+LETTER_MASK = 0x3F
+TERMINAL_BIT = 0x40
+LAST_EDGE_BIT = 0x80
+MAX_EDGES = 1 << 24
+
+
+class _BuildNode:
+    __slots__ = ('number', 'final', 'edges')
+
+    def __init__(self, number: int):
+        self.number = number
+        self.final = False
+        self.edges = {}
+
+
+class _Builder:
+    """Incremental construction of minimal automata from sorted input (Daciuk et al.)"""
+
+    def __init__(self):
+        self.register = {}  # Shared so the DAWG and GADDAG reuse identical subtrees
+        self.node_count = 0
+
+    def _new_node(self) -> _BuildNode:
+        self.node_count += 1
+        return _BuildNode(self.node_count)
+
+    def build(self, sequences: Iterable[Sequence[int]]) -> _BuildNode:
+        """Build a minimal automaton from code sequences in sorted order without duplicates"""
+        root = self._new_node()
+        unchecked: List[Tuple[_BuildNode, int, _BuildNode]] = []
+        previous: Sequence[int] = ()
+
+        for sequence in sequences:
+            common = 0
+            limit = min(len(sequence), len(previous))
+            while common < limit and sequence[common] == previous[common]:
+                common += 1
+            self._minimize(unchecked, common)
+
+            node = unchecked[-1][2] if unchecked else root
+            for code in sequence[common:]:
+                child = self._new_node()
+                node.edges[code] = child
+                unchecked.append((node, code, child))
+                node = child
+            node.final = True
+            previous = sequence
+
+        self._minimize(unchecked, 0)
+        return root
+
+    def _minimize(self, unchecked, down_to: int):
+        register = self.register
+        while len(unchecked) > down_to:
+            parent, code, child = unchecked.pop()
+            key = (child.final, tuple((c, n.number) for c, n in child.edges.items()))
+            existing = register.get(key)
+            if existing is not None:
+                parent.edges[code] = existing
+            else:
+                register[key] = child
+
+
+def _serialize(roots: List[Optional[_BuildNode]]) -> Tuple[array, List[int]]:
+    """Lay out the automata as a flat edge array, returning it and each root's edge index"""
+    edges = array('I', [0])
+    offsets = {}
+
+    # Allocate a contiguous block of edges for every node that has children
+    pending = [root for root in roots if root is not None]
+    seen = set()
+    ordered = []
+    while pending:
+        node = pending.pop()
+        if node.number in seen or not node.edges:
+            continue
+        seen.add(node.number)
+        ordered.append(node)
+        pending.extend(node.edges.values())
+
+    position = 1
+    for node in ordered:
+        offsets[node.number] = position
+        position += len(node.edges)
+    if position > MAX_EDGES:
+        raise ValueError(f"Dictionary too large for the compiled format ({position} edges)")
+
+    for node in ordered:
+        last = len(node.edges) - 1
+        for i, (code, child) in enumerate(node.edges.items()):
+            edge = code | (offsets.get(child.number, 0) << 8)
+            if child.final:
+                edge |= TERMINAL_BIT
+            if i == last:
+                edge |= LAST_EDGE_BIT
+            edges.append(edge)
+
+    return edges, [offsets.get(root.number, 0) if root is not None else 0 for root in roots]
+
+
+def gaddag_sequences(codes: Sequence[int]) -> Iterator[Tuple[int, ...]]:
+    """GADDAG paths of a word: each reversed prefix, then the separator and the rest"""
+    for i in range(1, len(codes) + 1):
+        reversed_prefix = tuple(reversed(codes[:i]))
+        if i == len(codes):
+            yield reversed_prefix
+        else:
+            yield reversed_prefix + (SEPARATOR,) + tuple(codes[i:])
+
+
+def file_digest(path: str) -> bytes:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def source_digest(path: str) -> bytes:
+    """Digest a compiled file is keyed on: the word list and the language pack's letter codes"""
+    return hashlib.sha256(LANGUAGE.fingerprint() + file_digest(path)).digest()
+
+
+def compile_words(words: Iterable[str], source_digest: bytes = b'', gaddag: bool = False) -> bytes:
+    """Compile a word list into the binary DAWG format, optionally with a GADDAG"""
+    sequences = sorted({tuple(codes) for codes in map(encode_word, words) if codes})
+    builder = _Builder()
+    roots = [builder.build(sequences), None]
+    if gaddag:
+        paths = sorted({path for codes in sequences for path in gaddag_sequences(codes)})
+        roots[1] = builder.build(paths)
+
+    edges, (dawg_root, gaddag_root) = _serialize(roots)
+    if sys.byteorder != 'little':
+        edges.byteswap()
+    header = HEADER.pack(MAGIC, source_digest.ljust(32, b'\0'), len(sequences), len(edges),
+                         dawg_root, gaddag_root)
+    return header + edges.tobytes()
+
+
+def compile_dictionary(dict_file: str, out_file: str, gaddag: bool = False):
+    """Compile a one-word-per-line text file, writing the result atomically"""
+    digest = source_digest(dict_file)
+    with open(dict_file, 'r', encoding='utf-8') as f:
+        data = compile_words((line.strip() for line in f if line.strip()), digest, gaddag)
+    tmp_file = out_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, out_file)
+
+
+def read_header(path: str) -> Optional[Tuple[bytes, int, int, int, int]]:
+    """Read a compiled file's header, None if it is missing or not in this format"""
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(raw) != HEADER.size:
+        return None
+    magic, digest, words, edge_count, dawg_root, gaddag_root = HEADER.unpack(raw)
+    if magic != MAGIC:
+        return None
+    return digest, words, edge_count, dawg_root, gaddag_root
+
+
+class Dawg:
+    """Read-only view of a compiled automaton; exposes the same node API as lexicon.Trie
+
+    Nodes are integers: the index of the node's first edge shifted left by one,
+    with the low bit set when the node ends a word.
+    """
+
+    def __init__(self, edges, root: int, word_count: int = 0, owner=None):
+        self.edges_data = edges
+        self.root = root << 1
+        self.word_count = word_count
+        self.gaddag: Optional['Dawg'] = None
+        self._owner = owner  # Keeps the memory map alive
+
+    @classmethod
+    def open(cls, path: str) -> 'Dawg':
+        """Memory-map a compiled file"""
+        header = read_header(path)
+        if header is None:
+            raise ValueError(f"'{path}' is not a compiled dictionary")
+        _, word_count, edge_count, dawg_root, gaddag_root = header
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if sys.byteorder == 'little':
+            edges = memoryview(mapped)[HEADER.size:HEADER.size + edge_count * 4].cast('I')
+        else:
+            edges = array('I', mapped[HEADER.size:HEADER.size + edge_count * 4])
+            edges.byteswap()
+        if len(edges) != edge_count:
+            raise ValueError(f"'{path}' is truncated")
+        dawg = cls(edges, dawg_root, word_count, mapped)
+        if gaddag_root:
+            dawg.gaddag = cls(edges, gaddag_root, word_count, mapped)
+        return dawg
+
+    @classmethod
+    def from_words(cls, words: Iterable[str], gaddag: bool = False) -> 'Dawg':
+        """Compile a word list in memory"""
+        data = compile_words(words, gaddag=gaddag)
+        _, _, word_count, edge_count, dawg_root, gaddag_root = HEADER.unpack_from(data)
+        edges = array('I', data[HEADER.size:])
+        if sys.byteorder != 'little':
+            edges.byteswap()
+        dawg = cls(edges, dawg_root, word_count)
+        if gaddag_root:
+            dawg.gaddag = cls(edges, gaddag_root, word_count)
+        return dawg
+
+    def child(self, node: int, code: int) -> Optional[int]:
+        index = node >> 1
+        if not index:
+            return None
+        edges = self.edges_data
+        while True:
+            edge = edges[index]
+            if edge & LETTER_MASK == code:
+                return ((edge >> 8) << 1) | ((edge >> 6) & 1)
+            if edge & LAST_EDGE_BIT:
+                return None
+            index += 1
+
+    def is_terminal(self, node: int) -> bool:
+        return bool(node & 1)
+
+    def edges(self, node: int) -> List[Tuple[int, int]]:
+        """List (letter code, child) pairs leaving a node"""
+        index = node >> 1
+        result = []
+        if not index:
+            return result
+        edges = self.edges_data
+        while True:
+            edge = edges[index]
+            result.append((edge & LETTER_MASK, ((edge >> 8) << 1) | ((edge >> 6) & 1)))
+            if edge & LAST_EDGE_BIT:
+                return result
+            index += 1
+
+    def walk(self, codes: Iterable[int], node: Optional[int] = None) -> Optional[int]:
+        """Follow a sequence of letter codes, None if the path leaves the automaton"""
+        if node is None:
+            node = self.root
+        child = self.child
+        for code in codes:
+            node = child(node, code)
+            if node is None:
+                return None
+        return node
+
+    def has_prefix(self, prefix: str) -> bool:
+        codes = encode_word(prefix)
+        return codes is not None and self.walk(codes) is not None
+
+    def match(self, pattern: str) -> List[str]:
+        """Words matching a pattern with '?' wildcards"""
+        return match_pattern(self, pattern)
+
+    def __contains__(self, word: str) -> bool:
+        codes = encode_word(word)
+        if not codes:
+            return False
+        # Inlined walk: membership tests are the hottest dictionary path
+        edges = self.edges_data
+        edge = 0
+        index = self.root >> 1
+        for code in codes:
+            if not index:
+                return False
+            edge = edges[index]
+            while edge & LETTER_MASK != code:
+                if edge & LAST_EDGE_BIT:
+                    return False
+                index += 1
+                edge = edges[index]
+            index = edge >> 8
+        return bool(edge & TERMINAL_BIT)
+
+    def __iter__(self) -> Iterator[str]:
+        """Yield every word, uppercase"""
+        stack = [(self.root, "")]
+        while stack:
+            node, prefix = stack.pop()
+            for code, child in reversed(self.edges(node)):
+                word = prefix + CODE_LETTERS[code]
+                if child & 1:
+                    yield word
+                stack.append((child, word))
+
+    def __len__(self) -> int:
+        return self.word_count
@@ -0,0 +1,183 @@
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+from board_state import BoardState, LETTER_VALUES, TILE_CODES
+from movegen import Move, MoveGenerator
+from tile import tile_letter
+from transposition import TranspositionTable, rack_hash
+
+DEFAULT_DEADLINE = 1.0  # Seconds
+PASS_KEY = 0x9E3779B97F4A7C15  # Mixed into the position key after a pass
+MASK_64 = (1 << 64) - 1
+MAX_DEPTH = 30
+
+# Transposition table bound types
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class EndgameResult(NamedTuple):
+    """Outcome of an endgame search, from the point of view of the side to move"""
+    value: int  # Points gained over the opponent from here to the end, rack penalties included
+    line: List[Optional[Move]]  # Best sequence of plays found, None for a pass
+    depth: int  # Deepest fully searched ply count
+    complete: bool  # True when the search reached the end of every line, so value is exact
+    nodes: int
+    seconds: float
+
+    @property
+    def best(self) -> Optional[Move]:
+        return self.line[0] if self.line else None
+
+
+class _Timeout(Exception):
+    pass
+
+
+def rack_value(rack: Sequence[str]) -> int:
+    return sum(LETTER_VALUES[TILE_CODES[letter]] for letter in rack)
+
+
+class EndgameSolver:
+    """Optimal play once the bag is empty and both racks are known
+
+    Negamax alpha-beta with iterative deepening: each iteration searches one
+    ply deeper, ordering moves by the previous iteration's best move, then
+    by whether they play out, then by score. Positions are memoized in a
+    transposition table keyed on the board's Zobrist hash and both racks.
+    When the deadline passes, the line from the last finished iteration is
+    returned.
+
+    Scoring follows the game rules: when a player goes out, every player
+    loses the value of their own unplayed tiles. Two passes in a row end
+    the game, since repeating them can only lead back to the same position.
+    Lines cut off at the depth limit are estimated as if the game ended there.
+    """
+
+    def __init__(self, generator: MoveGenerator, table: Optional[TranspositionTable] = None,
+                 deadline: float = DEFAULT_DEADLINE):
+        if generator.table is None:
+            # Iterative deepening regenerates the same positions' moves every iteration
+            generator = MoveGenerator(generator.lexicon, TranspositionTable(size_bits=14))
+        self.generator = generator
+        self.table = table if table is not None else TranspositionTable(size_bits=16)
+        self.deadline = deadline
+        self.nodes = 0
+        self._stop_at = 0.0
+        self._cancelled: Optional[Callable[[], bool]] = None
+        self._horizon = False  # Set when a line was cut off by the depth limit
+
+    def solve(self, state: BoardState, racks: Tuple[Sequence[str], Sequence[str]],
+              deadline: Optional[float] = None, cancelled: Optional[Callable[[], bool]] = None,
+              progress: Optional[Callable[[EndgameResult], None]] = None) -> EndgameResult:
+        """Find the best line for racks[0] to move against racks[1] on this board
+
+        The board is used as scratch space and is left exactly as it was.
+        The search also stops early once cancelled() returns True, and
+        progress() is called with the result of every finished iteration.
+        """
+        start = time.perf_counter()
+        self._stop_at = start + (self.deadline if deadline is None else deadline)
+        self._cancelled = cancelled
+        self.nodes = 0
+        self.table.new_search()
+        me, opponent = list(racks[0]), list(racks[1])
+
+        saved_cache = state.cross_checks
+        if saved_cache is None or saved_cache.lexicon is not self.generator.lexicon:
+            self.generator.attach(state)
+        result = EndgameResult(rack_value(opponent) - rack_value(me), [], 0, False, 0, 0.0)
+        try:
+            for depth in range(1, MAX_DEPTH + 1):
+                self._horizon = False
+                try:
+                    value, line = self._negamax(state, me, opponent, depth, -10 ** 6, 10 ** 6, False)
+                except _Timeout:
+                    break
+                result = EndgameResult(value, line, depth, not self._horizon, self.nodes,
+                                       time.perf_counter() - start)
+                if progress is not None:
+                    progress(result)
+                if not self._horizon:
+                    break
+        finally:
+            state.cross_checks = saved_cache
+        return result._replace(nodes=self.nodes, seconds=time.perf_counter() - start)
+
+    def _negamax(self, state: BoardState, me: List[str], opponent: List[str], depth: int,
+                 alpha: int, beta: int, passed: bool) -> Tuple[int, List[Optional[Move]]]:
+        self.nodes += 1
+        if time.perf_counter() > self._stop_at or (self._cancelled is not None and self._cancelled()):
+            raise _Timeout()
+        if depth == 0:
+            self._horizon = True
+            return rack_value(opponent) - rack_value(me), []
+
+        key = (state.zobrist ^ rack_hash(me) ^ ((rack_hash(opponent) * 3) & MASK_64) ^
+               (PASS_KEY if passed else 0))
+        entry = self.table.get(key)
+        best_first = None
+        if entry is not None:
+            entry_depth, value, bound, line, cut_off = entry
+            if entry_depth >= depth or not cut_off:
+                self._horizon = self._horizon or cut_off
+                if bound == EXACT:
+                    return value, line
+                if bound == LOWER:
+                    alpha = max(alpha, value)
+                elif bound == UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, line
+            best_first = line[0] if line else None
+
+        original_alpha = alpha
+        outer_horizon, self._horizon = self._horizon, False
+        moves: List[Optional[Move]] = sorted(
+            self.generator.generate(state, me),
+            key=lambda move: (len(move.placements) == len(me), move.score), reverse=True)
+        if best_first is not None and best_first in moves:
+            moves.remove(best_first)
+            moves.insert(0, best_first)
+        moves.append(None)  # Passing is always allowed
+
+        best_value, best_line = -10 ** 6, []
+        for move in moves:
+            if move is None:
+                if passed:
+                    # Both sides passed: the game ends with the racks as they are
+                    value, line = rack_value(opponent) - rack_value(me), []
+                else:
+                    value, line = self._negamax(state, opponent, me, depth - 1, -beta, -alpha, True)
+                    value = -value
+            else:
+                placements = move.tiles()
+                rest = list(me)
+                for letter in placements.values():
+                    rest.remove(tile_letter(letter))
+                if not rest:
+                    # Going out ends the game and the opponent keeps their tiles
+                    value, line = move.score + rack_value(opponent), []
+                else:
+                    state.commit_move(placements)
+                    try:
+                        # The child's value is relative to the position after this move's points
+                        value, line = self._negamax(state, opponent, rest, depth - 1,
+                                                    move.score - beta, move.score - alpha, False)
+                    finally:
+                        state.retract_move(placements)
+                    value = move.score - value
+            if value > best_value:
+                best_value, best_line = value, [move] + line
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= original_alpha:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        cut_off = self._horizon
+        self._horizon = outer_horizon or cut_off
+        self.table.put(key, (depth, best_value, bound, best_line, cut_off), depth)
+        return best_value, best_line
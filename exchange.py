@@ -0,0 +1,276 @@
+import math
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from board_state import BoardState
+from headless import RACK_SIZE
+from leaves import BINOMIAL, LeaveTable, MAX_LEAVE, SIZE_OFFSETS
+from movegen import Move, MoveGenerator
+from movelog import PLAY, EXCHANGE
+from tile import BagSnapshot, TileSystem, Rack, BLANK, tile_letter
+
+ADVICE_BUDGET = 0.3  # Seconds of simulation per position
+DRAWS_PER_ROUND = 16  # Draws every surviving candidate gets before any is dropped
+MIN_DRAWS = DRAWS_PER_ROUND  # Paired draws needed before simulated values are reported
+PRUNE_SIGMAS = 2.0  # Standard errors a candidate must trail the leader by to be dropped
+
+# Rough leave values for ranking candidates when no leave table has been built
+BLANK_BONUS = 10.0
+DUPLICATE_PENALTY = 4.0
+MEAN_COUNT = sum(TileSystem.INITIAL_COUNTS) / len(TileSystem.INITIAL_COUNTS)
+
+
+def rough_leave_value(rack: Rack) -> float:
+    """Leave value from the tile distribution alone
+
+    Plentiful letters are easy to play and rare ones hard; blanks are worth
+    keeping and duplicates are not.
+    """
+    value = 0.0
+    for letter, count, initial in zip(TileSystem.LETTERS, rack.counts, TileSystem.INITIAL_COUNTS):
+        if not count:
+            continue
+        if letter == BLANK:
+            value += BLANK_BONUS * count
+        else:
+            value += count * math.log(initial / MEAN_COUNT) - DUPLICATE_PENALTY * (count - 1)
+    return value
+
+
+def unseen_counts(state: BoardState, rack: Iterable[str]) -> List[int]:
+    """Tiles the player cannot see, per letter: the distribution less the board and their own rack
+
+    The opponents' racks are included, since the player cannot tell which
+    of these tiles are still in the bag.
+    """
+    counts = list(TileSystem.INITIAL_COUNTS)
+    index = TileSystem.LETTER_INDEX
+    for letter in list(state.get_tiles().values()) + list(rack):
+        counts[index[tile_letter(letter)]] -= 1
+    return counts
+
+
+class ExchangeOption(NamedTuple):
+    """One way to use the turn, with its static and simulated value"""
+    kind: str  # PLAY or EXCHANGE
+    letters: str  # Tiles exchanged, or played by the move
+    keep: str  # Tiles left on the rack before drawing
+    move: Optional[Move]
+    static: float  # Score plus leave value
+    value: Optional[float]  # Score plus the mean value of the refilled rack, None if not simulated
+    samples: int
+
+    def describe(self) -> str:
+        if self.kind == EXCHANGE:
+            action = f"exchange {self.letters}"
+        else:
+            action = f"play {self.move.word} at {self.move.notation()} for {self.move.score}"
+        if self.value is None:
+            estimate = f"static value {round(self.static, 1) + 0.0:.1f}"  # + 0.0 avoids printing -0.0
+        else:
+            estimate = f"expected {round(self.value, 1) + 0.0:.1f} over {self.samples} draws"
+        return f"{action} ({estimate}, keeping {self.keep or 'nothing'})"
+
+
+class ExchangeAdvice(NamedTuple):
+    best: Optional[ExchangeOption]  # None when there is nothing to do but pass
+    simulated: List[ExchangeOption]  # Options played out, by simulated value
+    unsimulated: List[ExchangeOption]  # The rest, by static value
+    samples: int  # Simulated draws over all options
+    seconds: float
+
+    def best_exchange(self) -> Optional[ExchangeOption]:
+        return self._best_of(EXCHANGE)
+
+    def best_play(self) -> Optional[ExchangeOption]:
+        return self._best_of(PLAY)
+
+    def _best_of(self, kind: str) -> Optional[ExchangeOption]:
+        """The best simulated option of a kind, or the best by static value if none was simulated"""
+        for options in (self.simulated, self.unsimulated):
+            option = next((option for option in options if option.kind == kind), None)
+            if option is not None:
+                return option
+        return None
+
+
+class _Leave:
+    """The tiles kept by one or more candidates, and the value of each redraw of them"""
+    __slots__ = ('keep', 'drawn', 'outcomes')
+
+    def __init__(self, keep: Rack, drawn: int):
+        self.keep = keep
+        self.drawn = drawn  # Tiles drawn to refill the rack
+        self.outcomes: List[float] = []  # Value of the refilled rack after each draw, in draw order
+
+
+class _Candidate:
+    """The outcomes of one option under simulation"""
+    __slots__ = ('kind', 'letters', 'move', 'score', 'static', 'leave')
+
+    def __init__(self, kind: str, letters: str, move: Optional[Move], score: int, static: float, leave: _Leave):
+        self.kind = kind
+        self.letters = letters
+        self.move = move
+        self.score = score
+        self.static = static
+        self.leave = leave  # Shared by every candidate keeping the same tiles
+
+    @property
+    def samples(self) -> int:
+        return len(self.leave.outcomes)
+
+    @property
+    def value(self) -> Optional[float]:
+        outcomes = self.leave.outcomes
+        return self.score + sum(outcomes) / len(outcomes) if outcomes else None
+
+    def trails(self, leader: '_Candidate') -> bool:
+        """Whether the leader is clearly better over the draws both have seen
+
+        The draws are paired, so the test is on the per-draw differences.
+        """
+        offset = leader.score - self.score
+        differences = [offset + a - b for a, b in zip(leader.leave.outcomes, self.leave.outcomes)]
+        n = len(differences)
+        if n < 2:
+            return False
+        mean = sum(differences) / n
+        variance = sum((d - mean) ** 2 for d in differences) / (n - 1)
+        return mean > PRUNE_SIGMAS * math.sqrt(variance / n)
+
+
+class ExchangeAdvisor:
+    """Decides between exchanging tiles and playing by simulating the draw that follows
+
+    Every exchange (each distinct set of tiles to keep, up to 127 for seven
+    different letters) and every play gets a static value: its score plus
+    the leave table's value of the tiles kept. The simulation then refills
+    each kept set from the tiles actually unseen, using TileSystem's bag,
+    and values the refilled rack through the leave table too; a full rack
+    is worth its best six-tile leave. This prices in what is really left
+    to draw, which the table, fitted over whole games, averages away, and
+    costs a few table lookups per draw rather than a move search, so every
+    option is simulated. Candidates that keep the same tiles share their
+    draws.
+
+    Draw i comes from the same random stream for every kept set, so
+    differences reflect the choices rather than luck. The candidates
+    advance together in rounds of DRAWS_PER_ROUND draws; after each round,
+    any candidate trailing the leader by more than PRUNE_SIGMAS standard
+    errors is dropped. Simulation stops when the survivors all keep the
+    same tiles or the time budget runs out. If fewer than MIN_DRAWS draws were made by then,
+    the advice falls back to the static ranking.
+    """
+
+    def __init__(self, generator: MoveGenerator, table: Optional[LeaveTable] = None,
+                 budget: float = ADVICE_BUDGET, seed: int = 0):
+        self.generator = generator
+        self.table = table
+        self.budget = budget
+        self.seed = seed
+
+    def leave_value(self, rack: Rack) -> float:
+        return self.table.value(rack) if self.table is not None else rough_leave_value(rack)
+
+    def rack_value(self, rack: Rack) -> float:
+        """Value of a refilled rack: the leave value, or the best leave within it when it is too large"""
+        if self.table is None or len(rack) <= MAX_LEAVE:
+            return self.leave_value(rack)
+        # Rank each leave missing one tile directly from the sorted letter indices (see leaves.leave_index)
+        codes = [code for code, count in enumerate(rack.counts) for _ in range(count)]
+        values = self.table.values
+        best = -math.inf
+        for skip in range(len(codes)):
+            if skip and codes[skip] == codes[skip - 1]:
+                continue
+            leave = codes[:skip] + codes[skip + 1:]
+            rank = SIZE_OFFSETS[len(leave)]
+            for i, code in enumerate(leave):
+                rank += BINOMIAL[code + i][i + 1]
+            best = max(best, values[rank])
+        return best
+
+    def advise(self, state: BoardState, rack: Iterable[str], bag_size: int,
+               unseen: Optional[List[int]] = None,
+               cancelled: Optional[Callable[[], bool]] = None) -> ExchangeAdvice:
+        """Rank the exchanges and plays open to a rack; exchanges need a full rack's worth of tiles in the bag"""
+        start = time.perf_counter()
+        rack = rack.copy() if isinstance(rack, Rack) else Rack(rack)
+        if unseen is None:
+            unseen = unseen_counts(state, rack)
+        candidates = self._candidates(state, rack, bag_size)
+
+        leaves = list({id(c.leave): c.leave for c in candidates}.values())
+        if len(candidates) > 1 and bag_size:
+            draws = self._simulate(candidates, unseen, start + self.budget, cancelled)
+            if draws < MIN_DRAWS:
+                # Too few draws to tell the options apart: report the static ranking only
+                for leave in leaves:
+                    leave.outcomes.clear()
+        samples = sum(len(leave.outcomes) for leave in leaves)
+        simulated = sorted((c for c in candidates if c.samples), key=lambda c: -c.value)
+        unsimulated = sorted((c for c in candidates if not c.samples), key=lambda c: -c.static)
+
+        if simulated:
+            # Among the candidates that were never dropped, the best mean wins
+            most = max(c.samples for c in simulated)
+            best = self._option(max((c for c in simulated if c.samples == most), key=lambda c: c.value))
+        else:
+            best = self._option(unsimulated[0]) if unsimulated else None
+        return ExchangeAdvice(best, [self._option(c) for c in simulated],
+                              [self._option(c) for c in unsimulated], samples, time.perf_counter() - start)
+
+    def _candidates(self, state: BoardState, rack: Rack, bag_size: int) -> List[_Candidate]:
+        leaves: Dict[Tuple[Tuple[int, ...], int], _Leave] = {}
+
+        def shared_leave(keep: Rack, drawn: int) -> _Leave:
+            key = (keep.key(), drawn)
+            if key not in leaves:
+                leaves[key] = _Leave(keep, drawn)
+            return leaves[key]
+
+        candidates = []
+        for move in self.generator.generate(state, rack):
+            letters = ''.join(letter for _, letter in move.placements)
+            keep = rack - Rack(tile_letter(letter) for letter in letters)
+            candidates.append(_Candidate(PLAY, letters, move, move.score, move.score + self.leave_value(keep),
+                                         shared_leave(keep, min(len(letters), bag_size))))
+        if bag_size >= RACK_SIZE:
+            for keep in rack.leaves():
+                if len(keep) < len(rack):
+                    letters = ''.join(rack - keep)
+                    candidates.append(_Candidate(EXCHANGE, letters, None, 0, self.leave_value(keep),
+                                                 shared_leave(keep, len(letters))))
+        return candidates
+
+    def _simulate(self, candidates: List[_Candidate], unseen: List[int], deadline: float,
+                  cancelled: Optional[Callable[[], bool]]) -> int:
+        """Run rounds of paired draws until one candidate is left or time runs out; returns the draws made"""
+        bag = TileSystem()
+        pool = BagSnapshot(tuple(unseen))
+        survivors = candidates
+        draw = 0
+        while True:
+            # Candidates keeping the same tiles differ only by score, so more draws cannot reorder them
+            leaves = list({id(c.leave): c.leave for c in survivors}.values())
+            if len(leaves) < 2:
+                return draw
+            for _ in range(DRAWS_PER_ROUND):
+                if time.perf_counter() > deadline or (cancelled is not None and cancelled()):
+                    return draw
+                # Every surviving kept set sees this draw before the next one starts
+                for leave in leaves:
+                    bag.restore(pool)
+                    bag.rng.seed(self.seed * 1000003 + draw)
+                    next_rack = leave.keep.copy()
+                    for letter in bag.draw_letters(leave.drawn):
+                        next_rack.add(letter)
+                    leave.outcomes.append(self.rack_value(next_rack))
+                draw += 1
+            leader = max(survivors, key=lambda c: c.value)
+            survivors = [c for c in survivors if not c.trails(leader)]
+
+    @staticmethod
+    def _option(candidate: _Candidate) -> ExchangeOption:
+        return ExchangeOption(candidate.kind, candidate.letters, ''.join(candidate.leave.keep), candidate.move,
+                              candidate.static, candidate.value, candidate.samples)
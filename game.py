@@ -1,20 +1,47 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, 
                            QVBoxLayout, QLabel, QPushButton,
-                           QMessageBox)
+                           QMessageBox, QCheckBox, QAction, QFileDialog)
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from board import ScrabbleBoard
-from tile import TileSystem
+from tile import TileSystem, tile_letter
 from rack import TileRack
+from movegen import MoveGenerator
+from movelog import LoggedMove, MoveLog, EXCHANGE, PASS, PLAY
+from compute import ComputeService, PositionSnapshot, advise_exchange, choose_move, find_hint, load_lexicon
+from transposition import TranspositionTable
+from profiling import PROFILER
+from layout import STANDARD
+
+# Seats in the move log
+PLAYER = 0
+COMPUTER = 1
 
 class ScrabbleGame(QMainWindow):
-    def __init__(self, dictionary):
+    dictionary_ready = pyqtSignal()  # The game can start
+
+    def __init__(self, dictionary=None, layout=STANDARD):
         super().__init__()
-        self.dictionary = dictionary
+        self.board_layout = layout  # Board geometry, fixed for the window's lifetime
+        self.dictionary = None  # Set by set_dictionary, possibly after a background load
         self.tile_system = TileSystem()
         self.score = 0
         self.rack = None
+        self.move_generator = None  # Built from the dictionary on first use
+        self.vs_computer = False
+        self.computer_rack = []
+        self.computer_score = 0
+        self.move_log = MoveLog()  # Every move of the current game, for saving as notation; no undo here
+        self.turn_move = None  # The player's move this turn, logged once its replacement tiles are drawn
+        self.compute = ComputeService(self)  # Hints and computer moves run off the GUI thread
+        self.compute.progress.connect(self.show_compute_progress)
+        self.compute.finished.connect(self.handle_compute_result)
+        self.compute.failed.connect(self.handle_compute_failure)
         self.initUI()
+        if dictionary is not None:
+            self.set_dictionary(dictionary)
+        else:
+            self.set_thinking(True)
 
     def initUI(self):
         self.setWindowTitle('Single Player Scrabble')
@@ -33,7 +60,7 @@ class ScrabbleGame(QMainWindow):
         self.rack = TileRack()
         
         # Pass rack and dictionary to board
-        self.board = ScrabbleBoard(tile_rack=self.rack, dictionary=self.dictionary)
+        self.board = ScrabbleBoard(tile_rack=self.rack, dictionary=self.dictionary, layout=self.board_layout)
         game_layout.addWidget(self.board)
         game_layout.addWidget(self.rack)
 
@@ -52,9 +79,16 @@ class ScrabbleGame(QMainWindow):
         
         self.tiles_remaining_label = QLabel("Tiles remaining: 100")
 
+        self.computer_score_label = QLabel("")
+        self.computer_score_label.setFont(QFont('Arial', 12))
+        self.last_computer_move_label = QLabel("")
+        self.status_label = QLabel("")
+        self.status_label.setWordWrap(True)
+
         # Game controls
-        new_game_btn = QPushButton("New Game")
-        new_game_btn.clicked.connect(self.start_new_game)
+        self.new_game_button = QPushButton("New Game")
+        self.new_game_button.clicked.connect(self.start_new_game)
+        self.new_game_button.setEnabled(False)  # Until the dictionary is ready
         
         exchange_tiles_btn = QPushButton("Exchange Tiles")
         exchange_tiles_btn.clicked.connect(self.exchange_tiles)
@@ -63,23 +97,114 @@ class ScrabbleGame(QMainWindow):
         skip_turn_btn = QPushButton("Skip Turn")
         skip_turn_btn.clicked.connect(self.skip_turn)
 
+        hint_btn = QPushButton("Hint")
+        hint_btn.clicked.connect(self.show_hint)
+
+        # Turn actions are disabled while the computer is thinking
+        self.turn_buttons = [exchange_tiles_btn, skip_turn_btn, hint_btn]
+
+        self.computer_checkbox = QCheckBox("Play against computer")
+        self.computer_checkbox.setToolTip("Takes effect when a new game starts")
+
         # Add widgets to sidebar
         sidebar_layout.addWidget(title_label)
         sidebar_layout.addWidget(self.score_label)
         sidebar_layout.addWidget(self.tiles_remaining_label)
-        sidebar_layout.addWidget(new_game_btn)
+        sidebar_layout.addWidget(self.computer_score_label)
+        sidebar_layout.addWidget(self.last_computer_move_label)
+        sidebar_layout.addWidget(self.status_label)
+        sidebar_layout.addWidget(self.new_game_button)
         sidebar_layout.addWidget(exchange_tiles_btn)
         sidebar_layout.addWidget(skip_turn_btn)
+        sidebar_layout.addWidget(hint_btn)
+        sidebar_layout.addWidget(self.computer_checkbox)
         sidebar_layout.addStretch()
 
         main_layout.addWidget(sidebar, stretch=1)
 
         # Connect signals
         self.board.word_played.connect(self.update_score)
+        self.board.word_played.connect(self.log_play)
         self.board.move_completed.connect(self.end_turn)
-        
-        # Start new game automatically
-        self.start_new_game()
+
+        self.create_game_menu()
+        self.create_debug_menu()
+
+    def create_game_menu(self):
+        game_menu = self.menuBar().addMenu("&Game")
+
+        save_action = QAction("Save Game...", self)
+        save_action.triggered.connect(self.save_game)
+        game_menu.addAction(save_action)
+
+    def save_game(self):
+        """Write the moves so far as game notation (see movelog.MoveLog.to_text)"""
+        path, _ = QFileDialog.getSaveFileName(self, "Save Game", "game.txt", "Game notation (*.txt)")
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.move_log.to_text())
+        except OSError as e:
+            QMessageBox.warning(self, "Save Failed", str(e))
+
+    def create_debug_menu(self):
+        """Profiling controls for diagnosing slow turns"""
+        debug_menu = self.menuBar().addMenu("&Debug")
+
+        self.profiling_action = QAction("Enable Profiling", self, checkable=True)
+        self.profiling_action.setChecked(PROFILER.enabled)
+        self.profiling_action.toggled.connect(self.set_profiling)
+        debug_menu.addAction(self.profiling_action)
+
+        show_action = QAction("Show Profile", self)
+        show_action.triggered.connect(self.show_profile)
+        debug_menu.addAction(show_action)
+
+        export_action = QAction("Export Profile...", self)
+        export_action.triggered.connect(self.export_profile)
+        debug_menu.addAction(export_action)
+
+        reset_action = QAction("Reset Profile", self)
+        reset_action.triggered.connect(PROFILER.reset)
+        debug_menu.addAction(reset_action)
+
+    def set_profiling(self, enabled):
+        if enabled:
+            PROFILER.enable()
+        else:
+            PROFILER.disable()
+
+    def show_profile(self):
+        if not PROFILER.process.timers:
+            QMessageBox.information(self, "Profile", "Nothing recorded yet. Enable profiling and play a few turns.")
+            return
+        QMessageBox.information(self, "Profile",
+                                f"<b>This game</b><pre>{PROFILER.summary('game')}</pre>"
+                                f"<b>Since launch</b><pre>{PROFILER.summary('process')}</pre>")
+
+    def export_profile(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Profile", "profile.json",
+                                              "JSON (*.json);;Prometheus text (*.prom *.txt)")
+        if path:
+            PROFILER.export(path)
+
+    def load_dictionary(self, dict_file, trace=None):
+        """Load the dictionary on the worker thread so the window can show immediately"""
+        self.set_thinking(True)
+        self.status_label.setText("Loading dictionary...")
+        self.compute.submit('dictionary', load_lexicon, dict_file, trace)
+
+    def set_dictionary(self, dictionary):
+        """Enable play with a loaded dictionary and offer a new game once the window is up"""
+        self.dictionary = dictionary
+        self.board.set_dictionary(dictionary)
+        self.move_generator = None
+        self.set_thinking(False)
+        self.new_game_button.setEnabled(True)
+        self.dictionary_ready.emit()
+        # Start a new game automatically, after pending paint events
+        QTimer.singleShot(0, self.start_new_game)
 
     def start_new_game(self):
         reply = QMessageBox.question(self, 'New Game', 
@@ -87,6 +212,11 @@ class ScrabbleGame(QMainWindow):
                                    QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
+            # Stop any analysis of the old position
+            self.compute.cancel()
+            self.set_thinking(False)
+            PROFILER.start_game()
+
             # Reset score and game state
             self.score = 0
             self.rack.clear_rack()
@@ -98,6 +228,16 @@ class ScrabbleGame(QMainWindow):
             self.tile_system.initialize_bag()
             initial_tiles = self.tile_system.draw_tiles(7)
             self.rack.add_tiles(initial_tiles)
+
+            # Deal the computer opponent's rack if enabled
+            self.vs_computer = self.computer_checkbox.isChecked()
+            self.computer_score = 0
+            self.computer_rack = self.tile_system.draw_tiles(7) if self.vs_computer else []
+            self.last_computer_move_label.setText("")
+
+            deal = [initial_tiles, self.computer_rack] if self.vs_computer else [initial_tiles]
+            self.move_log = MoveLog(''.join(tile.letter for tile in tiles) for tiles in deal)
+            self.turn_move = None
             
             self.update_remaining_tiles()
             self.update_score_display()
@@ -113,14 +253,17 @@ class ScrabbleGame(QMainWindow):
             
         selected_tiles = self.rack.get_selected_tiles()
         if not selected_tiles:
+            self.suggest_exchange()
             QMessageBox.information(self, "Select Tiles", 
                                   "Please select tiles to exchange by clicking them.")
             return
 
-        # Return selected tiles to bag and draw new ones
-        self.tile_system.return_tiles(selected_tiles)
+        # Draw new tiles before returning the selected ones to the bag
         new_tiles = self.tile_system.draw_tiles(len(selected_tiles))
+        self.tile_system.return_tiles(selected_tiles)
         self.rack.exchange_tiles(selected_tiles, new_tiles)
+        self.turn_move = LoggedMove(PLAYER, EXCHANGE, letters=''.join(tile.letter for tile in selected_tiles),
+                                    drawn=''.join(tile.letter for tile in new_tiles))
         
         # Exit exchange mode
         self.rack.set_exchange_mode(False)
@@ -128,42 +271,226 @@ class ScrabbleGame(QMainWindow):
         self.update_remaining_tiles()
         self.end_turn()
 
+    def suggest_exchange(self):
+        """Start the exchange advisor; its pick is preselected on the rack when it is ready"""
+        letters = [tile.letter for tile in self.rack.get_tiles()]
+        letters.extend(tile_letter(letter) for letter in self.board.current_move_tiles.values())
+        self.status_label.setText("Weighing exchanges...")
+        self.compute.submit('exchange', advise_exchange, self.get_move_generator(),
+                            self.position_snapshot(letters))
+
+    def show_exchange_advice(self, advice):
+        best = advice.best
+        if best is None or not self.rack.exchange_mode:
+            return
+        if best.kind == EXCHANGE:
+            self.rack.select_for_exchange(best.letters)
+            message = f"Suggested: {best.describe()}"
+            play = advice.best_play()
+            if play is not None:
+                message += f"; best play: {play.describe()}"
+        else:
+            message = f"Suggested: {best.describe()} rather than exchanging"
+        self.status_label.setText(message)
+
     def skip_turn(self):
         reply = QMessageBox.question(self, 'Skip Turn', 
                                    'Are you sure you want to skip your turn?',
                                    QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
+            self.turn_move = LoggedMove(PLAYER, PASS)
             self.end_turn()
 
+    def log_play(self, points):
+        """Note the player's confirmed word; it is logged in end_turn with the tiles drawn after it"""
+        tiles = self.board.current_move_tiles
+        self.turn_move = LoggedMove(PLAYER, PLAY, tuple(tiles), ''.join(tiles.values()), points)
+
     def update_score(self, points):
         self.score += points
         self.update_score_display()
 
     def update_score_display(self):
         self.score_label.setText(f"Score: {self.score}")
+        if self.vs_computer:
+            self.computer_score_label.setText(f"Computer: {self.computer_score}")
+        else:
+            self.computer_score_label.setText("")
 
     def update_remaining_tiles(self):
         count = self.tile_system.remaining_tiles()
         self.tiles_remaining_label.setText(f"Tiles remaining: {count}")
 
+    def get_move_generator(self):
+        """Get the move generator, building it from the dictionary on first use"""
+        if self.move_generator is None:
+            # Repeated hints for an unchanged position are answered from the table
+            self.move_generator = MoveGenerator.from_dictionary(self.dictionary, TranspositionTable(size_bits=10))
+        return self.move_generator
+
+    def position_snapshot(self, letters, opponent_letters=None):
+        """Copy the committed board and racks for a background search"""
+        return PositionSnapshot(self.board.state.snapshot(), tuple(letters),
+                                tuple(opponent_letters) if opponent_letters is not None else None,
+                                self.tile_system.remaining_tiles(), self.board.state.layout)
+
+    def set_thinking(self, thinking):
+        """Block player actions while the computer works out its move"""
+        self.board.setEnabled(not thinking)
+        self.rack.setEnabled(not thinking)
+        for button in self.turn_buttons:
+            button.setEnabled(not thinking)
+        if not thinking:
+            self.status_label.setText("")
+
+    def show_compute_progress(self, kind, message):
+        self.status_label.setText(message)
+
+    def handle_compute_result(self, kind, choice):
+        self.status_label.setText("")
+        if kind == 'dictionary':
+            if not len(choice):
+                self.dictionary_failed("The dictionary is empty!")
+            else:
+                self.set_dictionary(choice)
+        elif kind == 'hint':
+            self.show_hint_result(choice)
+        elif kind == 'computer':
+            self.apply_computer_move(choice.move)
+        elif kind == 'exchange':
+            self.show_exchange_advice(choice)
+
+    def handle_compute_failure(self, kind, error):
+        if kind == 'dictionary':
+            self.dictionary_failed(error.strip().splitlines()[-1])
+            return
+        self.set_thinking(False)
+        QMessageBox.warning(self, "Analysis Failed", error.strip().splitlines()[-1])
+
+    def dictionary_failed(self, message):
+        QMessageBox.critical(self, "Error", message)
+        self.close()
+
+    def show_hint(self):
+        """Start looking for the best move in the background; the answer is shown when it is found"""
+        # Consider tiles already put down in the current move as part of the rack
+        letters = [tile.letter for tile in self.rack.get_tiles()]
+        letters.extend(tile_letter(letter) for letter in self.board.current_move_tiles.values())
+        computer_letters = [tile.letter for tile in self.computer_rack] if self.vs_computer else None
+
+        self.status_label.setText("Looking for a hint...")
+        self.compute.submit('hint', find_hint, self.get_move_generator(), self.dictionary,
+                            self.position_snapshot(letters, computer_letters))
+
+    def show_hint_result(self, choice):
+        move = choice.move
+        if move is None:
+            if choice.endgame:
+                QMessageBox.information(self, "Hint", "Passing is your best option.")
+            else:
+                QMessageBox.information(self, "Hint", "No valid move found. Consider exchanging tiles.")
+            return
+
+        direction = "across" if move.direction == 'horizontal' else "down"
+        message = f"Best move: {move.word} at {move.notation()} {direction} for {move.score} points"
+        if choice.bingos:
+            message += f"\n\nBingo candidates: {', '.join(choice.bingos[:10])}"
+        QMessageBox.information(self, "Hint", message)
+
+    def computer_turn(self):
+        """Start the computer opponent's search for its highest scoring move, or the solved line in the endgame"""
+        # Return any tiles the player left on the board before the computer moves
+        if self.board.current_move_cells:
+            self.board.cancel_move()
+
+        letters = [tile.letter for tile in self.computer_rack]
+        player_letters = [tile.letter for tile in self.rack.get_tiles()]
+        self.set_thinking(True)
+        self.status_label.setText("Computer is thinking...")
+        self.compute.submit('computer', choose_move, self.get_move_generator(),
+                            self.position_snapshot(letters, player_letters))
+
+    def apply_computer_move(self, move):
+        """Play the move the computer chose, then hand the turn back to the player"""
+        self.set_thinking(False)
+        if move is None:
+            # Swap the whole rack when no word can be played
+            if self.tile_system.remaining_tiles() >= 7:
+                old_tiles = self.computer_rack
+                self.computer_rack = self.tile_system.draw_tiles(len(old_tiles))
+                self.tile_system.return_tiles(old_tiles)
+                self.move_log.record(LoggedMove(COMPUTER, EXCHANGE, letters=''.join(tile.letter for tile in old_tiles),
+                                                drawn=''.join(tile.letter for tile in self.computer_rack)))
+                self.last_computer_move_label.setText("Computer exchanged tiles")
+            else:
+                self.move_log.record(LoggedMove(COMPUTER, PASS))
+                self.last_computer_move_label.setText("Computer passed")
+            if self.is_game_finished():
+                self.game_over()
+            return
+
+        placements = move.tiles()
+        self.board.play_move(placements)
+        self.computer_score += move.score
+
+        # Remove the played tiles and refill the rack
+        for letter in placements.values():
+            letter = tile_letter(letter)
+            for i, tile in enumerate(self.computer_rack):
+                if tile.letter == letter:
+                    del self.computer_rack[i]
+                    break
+        new_tiles = self.tile_system.draw_tiles(7 - len(self.computer_rack))
+        self.computer_rack.extend(new_tiles)
+        self.move_log.record(LoggedMove(COMPUTER, PLAY, tuple(placements), ''.join(placements.values()),
+                                        move.score, ''.join(tile.letter for tile in new_tiles)))
+
+        self.last_computer_move_label.setText(
+            f"Computer played {move.word} at {move.notation()} for {move.score}")
+        self.update_remaining_tiles()
+        self.update_score_display()
+        if self.is_game_finished():
+            self.game_over()
+
+    def is_game_finished(self):
+        if self.tile_system.remaining_tiles() > 0:
+            return False
+        return len(self.rack.get_tiles()) == 0 or (self.vs_computer and not self.computer_rack)
+
     def end_turn(self):
+        # Pending hints and exchange advice were for the position before this turn
+        self.compute.cancel('hint')
+        self.compute.cancel('exchange')
+        self.status_label.setText("")
+
         # Draw new tiles
         new_tiles = self.tile_system.draw_tiles(7 - len(self.rack.get_tiles()))
         self.rack.add_tiles(new_tiles)
+        if self.turn_move is not None:
+            drawn = self.turn_move.drawn + ''.join(tile.letter for tile in new_tiles)
+            self.move_log.record(self.turn_move._replace(drawn=drawn))
+            self.turn_move = None
         
         self.update_remaining_tiles()
         
         # Check for game end
-        if self.tile_system.remaining_tiles() == 0 and len(self.rack.get_tiles()) == 0:
+        if self.is_game_finished():
             self.game_over()
+            return
+
+        if self.vs_computer:
+            self.computer_turn()
 
     def game_over(self):
         # Subtract unplayed tiles from score
         rack_value = self.rack.get_rack_value()
         self.score -= rack_value
+
+        message = f"Game Over!\n\nFinal Score: {self.score}"
+        if self.vs_computer:
+            self.computer_score -= sum(tile.value for tile in self.computer_rack)
+            message += f"\nComputer Score: {self.computer_score}"
         self.update_score_display()
         
-        QMessageBox.information(self, "Game Over", 
-                              f"Game Over!\n\n"
-                              f"Final Score: {self.score}")
\ No newline at end of file
+        QMessageBox.information(self, "Game Over", message)
@@ -0,0 +1,277 @@
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+import random
+from board_state import BoardState
+from layout import BoardLayout, STANDARD
+from movegen import Move, MoveGenerator
+from movelog import LoggedMove, MoveLog, PLAY, EXCHANGE, PASS
+from tile import TileSystem, tile_letter
+
+RACK_SIZE = 7
+MAX_SCORELESS_TURNS = 6  # Game ends after this many passes/exchanges in a row
+
+# A policy picks one of the legal moves for the player to move, or None to pass
+Policy = Callable[['HeadlessGame', List[Move], List[str]], Optional[Move]]
+
+
+def greedy_policy(game: 'HeadlessGame', moves: List[Move], rack: List[str]) -> Optional[Move]:
+    """Play the highest scoring move"""
+    if not moves:
+        return None
+    return max(moves, key=lambda move: move.score)
+
+
+def random_policy(game: 'HeadlessGame', moves: List[Move], rack: List[str]) -> Optional[Move]:
+    """Play a uniformly random legal move"""
+    if not moves:
+        return None
+    return game.rng.choice(moves)
+
+
+def equity_policy(game: 'HeadlessGame', moves: List[Move], rack: List[str]) -> Optional[Move]:
+    """Play the move with the best score plus leave value, falling back to greedy without a table"""
+    from leaves import default_table
+    table = default_table()
+    if not moves or table is None:
+        return greedy_policy(game, moves, rack)
+    return max(moves, key=lambda move: table.equity(rack, move))
+
+
+def endgame_policy(game: 'HeadlessGame', moves: List[Move], rack: List[str]) -> Optional[Move]:
+    """Solve two-player endgames once the bag is empty, playing greedily before that"""
+    if game.tile_system.remaining_tiles() or len(game.racks) != 2 or not moves:
+        return greedy_policy(game, moves, rack)
+    from endgame import EndgameSolver
+    solver = EndgameSolver(game.generator)
+    return solver.solve(game.state, (rack, game.racks[1 - game.to_move])).best
+
+
+POLICIES: Dict[str, Policy] = {
+    'greedy': greedy_policy,
+    'random': random_policy,
+    'equity': equity_policy,
+    'endgame': endgame_policy,
+}
+
+
+def resolve_policy(name: str) -> Policy:
+    """Look up a built-in policy by name, or import one given as 'module:function'"""
+    if name in POLICIES:
+        return POLICIES[name]
+    if ':' in name:
+        import importlib
+        module_name, attr = name.split(':', 1)
+        return getattr(importlib.import_module(module_name), attr)
+    raise ValueError(f"Unknown policy '{name}'. Built-in policies: {', '.join(POLICIES)}")
+
+
+class HeadlessGame:
+    """A complete multi-player game on BoardState and TileSystem, without any Qt
+
+    Players with a policy move through play_turn(); players driven from
+    outside (policy None, e.g. network clients) submit moves with
+    play_move(), exchange() and pass_turn(). Every move goes into a MoveLog,
+    and undo()/redo() step through it in time proportional to the move.
+    """
+
+    def __init__(self, generator: Optional[MoveGenerator], policies: List[Optional[Policy]], dictionary=None,
+                 seed: Optional[int] = None, bag_seed: Optional[int] = None, layout: BoardLayout = STANDARD):
+        """Deal a new game
+
+        With a bag_seed, the bag is shuffled once from its own random source
+        (see TileSystem's ordered bag), so games sharing a bag_seed deal the
+        same tiles to the same seats whatever the policies do.
+        """
+        self.generator = generator
+        self.policies = policies
+        self.state = BoardState(dictionary, layout)
+        if generator is not None:
+            generator.attach(self.state)
+        self.rng = random.Random(seed)  # Shared by the bag and the policies, so a seed replays the game
+        if bag_seed is None:
+            self.tile_system = TileSystem(rng=self.rng)
+        else:
+            self.tile_system = TileSystem(seed=bag_seed, ordered=True)
+        self.racks: List[List[str]] = [[] for _ in policies]
+        self.scores = [0] * len(policies)
+        self.bingos = [0] * len(policies)
+        self.plays = [0] * len(policies)
+        self.to_move = 0
+        self.turns = 0
+        self.scoreless_turns = 0
+        self.game_over = False  # True once a player went out with the bag empty
+        self.finished = False
+        self.penalties: List[int] = []  # Unplayed tile values subtracted by finish()
+        for rack in self.racks:
+            self.draw(rack)
+        self.log = MoveLog(''.join(rack) for rack in self.racks)
+
+    @classmethod
+    def from_log(cls, log: MoveLog, generator: Optional[MoveGenerator], policies: List[Optional[Policy]],
+                 dictionary=None, layout: BoardLayout = STANDARD) -> 'HeadlessGame':
+        """Rebuild a game from its move log, e.g. one read with MoveLog.from_text()"""
+        game = cls(generator, policies, dictionary, layout=layout)
+        game.tile_system.initialize_bag()
+        for player, letters in enumerate(log.deal):
+            game.racks[player] = list(letters)
+            game.tile_system.take_letters(game.racks[player])
+        game.log = log
+        log.cursor = 0
+        while game.redo():
+            pass
+        return game
+
+    def draw(self, rack: List[str], letters: Optional[str] = None) -> str:
+        """Refill a rack from the bag, or with the given letters when replaying a move"""
+        if letters is None:
+            drawn = self.tile_system.draw_letters(RACK_SIZE - len(rack))
+        else:
+            drawn = list(letters)
+            self.tile_system.take_letters(drawn)
+        rack.extend(drawn)
+        return ''.join(drawn)
+
+    def play_turn(self):
+        """Let the player to move choose and make a move"""
+        player = self.to_move
+        rack = self.racks[player]
+        moves = self.generator.generate(self.state, rack)
+        move = self.policies[player](self, moves, rack)
+
+        if move is not None:
+            self._apply_play(move.tiles(), move.score)
+        elif self.tile_system.remaining_tiles() >= RACK_SIZE:
+            # Swap the whole rack when possible, otherwise pass
+            self.exchange(list(rack))
+        else:
+            self.pass_turn()
+
+    def play_move(self, placements: Dict[Tuple[int, int], str]) -> Optional[int]:
+        """Validate and play a move for the player to move, returning its score or None if illegal"""
+        if self.finished or not self._rack_holds(tile_letter(letter) for letter in placements.values()):
+            return None
+        score = self.state.validate_move(placements)
+        if score is not None:
+            self._apply_play(placements, score)
+        return score
+
+    def exchange(self, letters: List[str], drawn: Optional[str] = None) -> bool:
+        """Swap rack letters for new ones from the bag, False if not allowed"""
+        rack = self.racks[self.to_move]
+        if (self.finished or not letters or self.tile_system.remaining_tiles() < RACK_SIZE or
+                not self._rack_holds(letters)):
+            return False
+        # In a fixed order, so the bag does not depend on how the rack happens to be arranged
+        letters = sorted(letters)
+        for letter in letters:
+            rack.remove(letter)
+        drawn = self.draw(rack, drawn)
+        self.tile_system.return_letters(letters)
+        self.log.record(LoggedMove(self.to_move, EXCHANGE, letters=''.join(letters), drawn=drawn))
+        self.scoreless_turns += 1
+        self._end_turn()
+        return True
+
+    def pass_turn(self):
+        """Skip the current player's turn"""
+        if self.finished:
+            return
+        self.log.record(LoggedMove(self.to_move, PASS))
+        self.scoreless_turns += 1
+        self._end_turn()
+
+    def undo(self) -> bool:
+        """Take back the last move, restoring board, rack, bag and scores; False if there is none"""
+        if not self.log.can_undo():
+            return False
+        if self.finished:
+            for player, penalty in enumerate(self.penalties):
+                self.scores[player] += penalty
+            self.penalties = []
+            self.finished = self.game_over = False
+
+        move = self.log.step_back()
+        player = move.player
+        rack = self.racks[player]
+        if move.kind == EXCHANGE:
+            # The exchanged tiles went into the bag after the draw, so they come out first
+            self.tile_system.take_back_letters(list(move.letters))
+        for letter in move.drawn:
+            rack.remove(letter)
+        self.tile_system.undraw_letters(list(move.drawn))
+        if move.kind == PLAY:
+            self.state.retract_move(move.squares)
+            rack.extend(tile_letter(letter) for letter in move.letters)
+            self.scores[player] -= move.score
+            self.plays[player] -= 1
+            if len(move.letters) == RACK_SIZE:
+                self.bingos[player] -= 1
+        elif move.kind == EXCHANGE:
+            rack.extend(move.letters)
+        self.to_move = player
+        self.turns -= 1
+        self.scoreless_turns = self.log.scoreless_run()
+        return True
+
+    def redo(self) -> bool:
+        """Replay the next undone move with its recorded draw; False if there is none"""
+        move = self.log.next_move()
+        if move is None or self.finished:
+            return False
+        if move.player != self.to_move:
+            raise ValueError(f"Logged move is for player {move.player}, but player {self.to_move} is to move")
+        if move.kind == PLAY:
+            self._apply_play(move.placements(), move.score, move.drawn)
+        elif move.kind == EXCHANGE:
+            if not self.exchange(list(move.letters), move.drawn):
+                raise ValueError(f"Logged exchange of {move.letters} is not possible")
+        else:
+            self.pass_turn()
+        return True
+
+    def _rack_holds(self, letters) -> bool:
+        """Check that the player to move has all the given letters"""
+        needed = Counter(letters)
+        available = Counter(self.racks[self.to_move])
+        return all(available[letter] >= count for letter, count in needed.items())
+
+    def _apply_play(self, placements: Dict[Tuple[int, int], str], score: int, drawn: Optional[str] = None):
+        player = self.to_move
+        rack = self.racks[player]
+        self.state.commit_move(placements)
+        for letter in placements.values():
+            rack.remove(tile_letter(letter))
+        self.scores[player] += score
+        self.plays[player] += 1
+        if len(placements) == RACK_SIZE:
+            self.bingos[player] += 1
+        drawn = self.draw(rack, drawn)
+        self.log.record(LoggedMove(player, PLAY, tuple(placements),
+                                   ''.join(placements.values()), score, drawn))
+        self.scoreless_turns = 0
+        self._end_turn()
+
+    def _end_turn(self):
+        self.turns += 1
+        if self.tile_system.remaining_tiles() == 0 and not self.racks[self.to_move]:
+            self.game_over = True
+            self.finish()
+        elif self.scoreless_turns >= MAX_SCORELESS_TURNS:
+            self.finish()
+        else:
+            self.to_move = (self.to_move + 1) % len(self.policies)
+
+    def finish(self):
+        """Subtract unplayed tiles from each score"""
+        self.penalties = [sum(self.tile_system.get_letter_value(letter) for letter in rack) for rack in self.racks]
+        for player, penalty in enumerate(self.penalties):
+            self.scores[player] -= penalty
+        self.finished = True
+
+    def play(self, max_turns: int = 200) -> 'HeadlessGame':
+        """Play until the game ends"""
+        while not self.finished and self.turns < max_turns:
+            self.play_turn()
+        if not self.finished:
+            self.finish()
+        return self
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+from typing import Dict, NamedTuple, Optional
+
+PACK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class LanguagePack(NamedTuple):
+    """Everything that depends on the language: tiles, alphabet and word list
+
+    The alphabet is the order of the tile table, which fixes each letter's
+    integer code. Variants are alternative spellings of tile letters that
+    are folded into them once, when a word list is compiled or a word is
+    encoded, so lookups compare codes and never re-normalize strings.
+    """
+    code: str
+    name: str
+    tiles: Dict[str, Dict[str, int]]  # Letter -> {'count', 'value'}, '*' for the blank
+    variants: Dict[str, str]  # Uppercase variant -> uppercase tile letter
+    dictionary: Optional[str] = None  # Default word list, relative to PACK_DIR
+
+    @property
+    def alphabet(self):
+        return list(self.tiles)
+
+    def variant_table(self) -> Dict[int, str]:
+        """str.translate table folding variants in either case, keeping the case"""
+        table = {}
+        for variant, letter in self.variants.items():
+            table[ord(variant)] = letter
+            table[ord(variant.lower())] = letter.lower()
+        return table
+
+    def fingerprint(self) -> bytes:
+        """Digest of what compiled word lists depend on: letter order and folding"""
+        spec = json.dumps([self.alphabet, sorted(self.variants.items())], ensure_ascii=False)
+        return hashlib.sha256(spec.encode('utf-8')).digest()
+
+    def dictionary_path(self) -> Optional[str]:
+        return os.path.join(PACK_DIR, self.dictionary) if self.dictionary else None
+
+
+ROMANIAN = LanguagePack(
+    code='ro',
+    name='Română',
+    # Standard Romanian Scrabble tile distribution
+    tiles={
+        'A': {'count': 11, 'value': 1},
+        'B': {'count': 2, 'value': 9},
+        'C': {'count': 5, 'value': 1},
+        'D': {'count': 4, 'value': 2},
+        'E': {'count': 9, 'value': 1},
+        'F': {'count': 2, 'value': 8},
+        'G': {'count': 2, 'value': 9},
+        'H': {'count': 1, 'value': 10},
+        'I': {'count': 10, 'value': 1},
+        'Î': {'count': 1, 'value': 8},
+        'J': {'count': 1, 'value': 10},
+        'L': {'count': 4, 'value': 1},
+        'M': {'count': 3, 'value': 4},
+        'N': {'count': 6, 'value': 1},
+        'O': {'count': 5, 'value': 1},
+        'P': {'count': 4, 'value': 2},
+        'R': {'count': 7, 'value': 1},
+        'S': {'count': 5, 'value': 1},
+        'Ș': {'count': 1, 'value': 8},
+        'T': {'count': 7, 'value': 1},
+        'Ț': {'count': 1, 'value': 8},
+        'U': {'count': 6, 'value': 1},
+        'V': {'count': 2, 'value': 8},
+        'X': {'count': 1, 'value': 10},
+        'Z': {'count': 1, 'value': 10},
+        '*': {'count': 2, 'value': 0}  # Blank tiles
+    },
+    # Legacy cedilla encodings of the comma-below letters
+    variants={'Ş': 'Ș', 'Ţ': 'Ț'},
+    dictionary='dic.txt',
+)
+
+# The pack the game runs with
+LANGUAGE = ROMANIAN
+VARIANT_TABLE = LANGUAGE.variant_table()
+
+
+def fold_variants(text: str) -> str:
+    """Replace variant spellings with tile letters, keeping case (lowercase marks a blank)"""
+    return text.translate(VARIANT_TABLE)
+
+
+def normalize_word(word: str) -> str:
+    """Canonical uppercase spelling of a word in the pack's tile letters"""
+    return word.upper().translate(VARIANT_TABLE)
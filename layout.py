@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Premium type -> (letter multiplier, word multiplier)
+PREMIUMS = {
+    'DL': (2, 1),
+    'TL': (3, 1),
+    'QL': (4, 1),
+    'DW': (1, 2),
+    'TW': (1, 3),
+    'QW': (1, 4),
+}
+
+_ZOBRIST_KEYS: Dict[int, List[int]] = {}
+
+
+def zobrist_keys(size: int) -> List[int]:
+    """A random 64-bit key per (square, letter code), indexed by square << 8 | code
+
+    The seed is fixed so position hashes are the same in every process. The
+    keys are shared by every layout of the same size; BoardLayout.key_salt
+    tells the layouts apart.
+    """
+    keys = _ZOBRIST_KEYS.get(size)
+    if keys is None:
+        rng = random.Random(0x5C7AB1E)
+        keys = _ZOBRIST_KEYS[size] = [rng.getrandbits(64) for _ in range(size * size * 256)]
+    return keys
+
+
+class BoardLayout:
+    """The geometry of a board: its size, centre square and premium squares
+
+    A layout is plain data compiled once into flat per-index tables, so the
+    rules, scoring and move generation read a square's multipliers and
+    neighbours with one list lookup whatever the board size.
+    """
+
+    def __init__(self, name: str, size: int, premiums: Dict[str, Iterable[Tuple[int, int]]],
+                 center: Optional[Tuple[int, int]] = None):
+        self.name = name
+        self.size = size
+        self.squares = size * size
+        self.center = tuple(center) if center is not None else (size // 2, size // 2)
+        self.center_index = self.index(*self.center)
+        self.premiums = {bonus_type: sorted(tuple(position) for position in positions)
+                         for bonus_type, positions in premiums.items()}
+
+        self.letter_multipliers = bytearray([1]) * self.squares
+        self.word_multipliers = bytearray([1]) * self.squares
+        self.bonus_types = [""] * self.squares
+        for bonus_type, positions in self.premiums.items():
+            if bonus_type not in PREMIUMS:
+                raise ValueError(f"Unknown premium type '{bonus_type}' in layout '{name}'")
+            letter_mult, word_mult = PREMIUMS[bonus_type]
+            for row, col in positions:
+                index = self.index(row, col)
+                if self.bonus_types[index]:
+                    raise ValueError(f"Square {(row, col)} has two premiums in layout '{name}'")
+                self.letter_multipliers[index] = letter_mult
+                self.word_multipliers[index] = word_mult
+                self.bonus_types[index] = bonus_type
+        self.letter_multipliers = bytes(self.letter_multipliers)
+        self.word_multipliers = bytes(self.word_multipliers)
+
+        # Starting hash of an empty board, so equal tiles on different layouts hash differently
+        digest = hashlib.blake2b(bytes([size]) + bytes(self.center) + self.letter_multipliers +
+                                 self.word_multipliers, digest_size=8).digest()
+        self.key_salt = int.from_bytes(digest, 'little')
+
+        # Orthogonal neighbours of each square, so edge tests are never repeated
+        self.neighbours = tuple(
+            tuple(index + offset for offset, inside in ((-size, row > 0), (size, row < size - 1),
+                                                        (-1, col > 0), (1, col < size - 1)) if inside)
+            for index, (row, col) in enumerate(divmod(i, size) for i in range(self.squares)))
+
+    def index(self, row: int, col: int) -> int:
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            raise ValueError(f"Square {(row, col)} is off the {self.size}x{self.size} board")
+        return row * self.size + col
+
+    def contains(self, row: int, col: int) -> bool:
+        return 0 <= row < self.size and 0 <= col < self.size
+
+    @property
+    def square_keys(self) -> List[int]:
+        return zobrist_keys(self.size)
+
+    @classmethod
+    def symmetric(cls, name: str, size: int, octant: Dict[str, Iterable[Tuple[int, int]]],
+                  center: Optional[Tuple[int, int]] = None) -> 'BoardLayout':
+        """A layout with the board's eight-fold symmetry, given the premiums of one corner
+
+        Each listed square is reflected across both axes and the diagonals.
+        """
+        last = size - 1
+        premiums = {}
+        for bonus_type, positions in octant.items():
+            squares = set()
+            for row, col in positions:
+                for r, c in ((row, col), (col, row)):
+                    squares.update({(r, c), (r, last - c), (last - r, c), (last - r, last - c)})
+            premiums[bonus_type] = squares
+        return cls(name, size, premiums, center)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BoardLayout':
+        """Read a layout written as JSON-style data, e.g.
+
+        {"name": "mini", "size": 11, "symmetric": true, "premiums": {"TW": [[0, 0]], "DL": [[1, 4]]}}
+
+        With "symmetric", the premiums list one corner only (see symmetric()).
+        """
+        size = int(data['size'])
+        premiums = {bonus_type: [tuple(position) for position in positions]
+                    for bonus_type, positions in data.get('premiums', {}).items()}
+        center = data.get('center')
+        if data.get('symmetric'):
+            return cls.symmetric(data['name'], size, premiums, center)
+        return cls(data['name'], size, premiums, center)
+
+    def to_dict(self) -> Dict:
+        return {'name': self.name, 'size': self.size, 'center': list(self.center),
+                'premiums': {bonus_type: [list(position) for position in positions]
+                             for bonus_type, positions in self.premiums.items()}}
+
+    @classmethod
+    def load(cls, path: str) -> 'BoardLayout':
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def __repr__(self) -> str:
+        return f"BoardLayout({self.name!r}, {self.size}x{self.size})"
+
+
+STANDARD = BoardLayout('standard', 15, {
+    'TW': [(0,0), (0,7), (0,14), (7,0), (7,14), (14,0), (14,7), (14,14)],
+    'DW': [(1,1), (1,13), (2,2), (2,12), (3,3), (3,11), (4,4), (4,10),
+           (10,4), (10,10), (11,3), (11,11), (12,2), (12,12), (13,1), (13,13)],
+    'TL': [(1,5), (1,9), (5,1), (5,5), (5,9), (5,13), (9,1), (9,5),
+           (9,9), (9,13), (13,5), (13,9)],
+    'DL': [(0,3), (0,11), (2,6), (2,8), (3,0), (3,7), (3,14),
+           (6,2), (6,6), (6,8), (6,12), (7,3), (7,11),
+           (8,2), (8,6), (8,8), (8,12), (11,0), (11,7), (11,14),
+           (12,6), (12,8), (14,3), (14,11)]
+})
+
+# 21x21 board modelled on Super Scrabble: quadruple word corners, quadruple
+# letters near the edges and the standard pattern spread over the larger grid
+SUPER = BoardLayout.symmetric('super', 21, {
+    'QW': [(0, 0)],
+    'TW': [(0, 7), (3, 10)],
+    'DW': [(1, 1), (2, 2), (3, 3), (4, 4), (6, 6), (9, 9), (5, 10)],
+    'QL': [(1, 5), (2, 9)],
+    'TL': [(1, 8), (4, 9), (5, 5)],
+    'DL': [(0, 3), (0, 10), (2, 6), (3, 7), (6, 10), (7, 7), (8, 8)],
+})
+
+LAYOUTS = {layout.name: layout for layout in (STANDARD, SUPER)}
+
+
+def get_layout(name: str) -> BoardLayout:
+    """A built-in layout by name, or a custom one from a JSON file"""
+    if name in LAYOUTS:
+        return LAYOUTS[name]
+    if os.path.exists(name):
+        return BoardLayout.load(name)
+    raise ValueError(f"Unknown board layout '{name}' (built in: {', '.join(LAYOUTS)})")
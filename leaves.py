@@ -0,0 +1,226 @@
+import argparse
+import os
+import struct
+import sys
+from array import array
+from collections import Counter
+from math import comb
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from tile import TileSystem, tile_letter
+
+LETTERS = TileSystem.LETTERS
+LETTER_INDEX = TileSystem.LETTER_INDEX
+MAX_LEAVE = 6
+ALPHABET_SIZE = len(LETTERS)
+LEAVES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'leaves.bin')
+
+MAGIC = b'SCLEAVE1'
+HEADER = struct.Struct('<8sII')  # magic, alphabet size, max leave size
+
+# Binomial coefficients used to rank sorted leaves: BINOMIAL[n][k] = C(n, k)
+BINOMIAL = [[comb(n, k) for k in range(MAX_LEAVE + 1)] for n in range(ALPHABET_SIZE + MAX_LEAVE + 1)]
+# Index of the first leave of each size
+SIZE_OFFSETS = [comb(ALPHABET_SIZE + k - 1, k - 1) if k else 0 for k in range(MAX_LEAVE + 2)]
+TABLE_SIZE = SIZE_OFFSETS[MAX_LEAVE + 1]
+
+# Shrinkage towards the additive model: observed means count fully after this many samples
+PRIOR_SAMPLES = 20.0
+
+
+def leave_index(letters: Iterable[str]) -> int:
+    """Rank a leave of up to 6 letters among all multisets of the tile alphabet
+
+    The sorted letter indices a_0 <= ... <= a_k-1 map to the strictly
+    increasing a_i + i, whose colex rank is the sum of C(a_i + i, i + 1).
+    """
+    codes = sorted(LETTER_INDEX[letter] for letter in letters)
+    rank = SIZE_OFFSETS[len(codes)]
+    for i, code in enumerate(codes):
+        rank += BINOMIAL[code + i][i + 1]
+    return rank
+
+
+def leave_after(rack: Sequence[str], move) -> List[str]:
+    """Letters left on the rack after a move"""
+    leave = list(rack)
+    for letter in move.tiles().values():
+        leave.remove(tile_letter(letter))
+    return leave
+
+
+def enumerate_leaves(max_size: int = MAX_LEAVE) -> Iterable[Tuple[int, ...]]:
+    """Every leave that can be drawn from the tile distribution, as sorted letter indices"""
+    limits = TileSystem.INITIAL_COUNTS
+
+    def extend(prefix: List[int], start: int):
+        yield tuple(prefix)
+        if len(prefix) == max_size:
+            return
+        for code in range(start, ALPHABET_SIZE):
+            if prefix.count(code) < limits[code]:
+                prefix.append(code)
+                yield from extend(prefix, code)
+                prefix.pop()
+
+    yield from extend([], 0)
+
+
+class LeaveTable:
+    """Value of every rack leave of up to 6 tiles, stored in a flat float array"""
+
+    def __init__(self, values: Optional[array] = None):
+        self.values = values if values is not None else array('f', bytes(4 * TABLE_SIZE))
+
+    def value(self, letters: Iterable[str]) -> float:
+        """Look up the value of the tiles kept on the rack"""
+        codes = sorted(LETTER_INDEX[letter] for letter in letters)
+        if len(codes) > MAX_LEAVE:
+            return 0.0
+        rank = SIZE_OFFSETS[len(codes)]
+        for i, code in enumerate(codes):
+            rank += BINOMIAL[code + i][i + 1]
+        return self.values[rank]
+
+    def equity(self, rack: Sequence[str], move) -> float:
+        """Move score plus the value of the leave it keeps"""
+        return move.score + self.value(leave_after(rack, move))
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, ALPHABET_SIZE, MAX_LEAVE))
+            self.values.tofile(f)
+
+    @classmethod
+    def load(cls, path: str) -> 'LeaveTable':
+        with open(path, 'rb') as f:
+            magic, alphabet_size, max_leave = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or alphabet_size != ALPHABET_SIZE or max_leave != MAX_LEAVE:
+                raise ValueError(f"'{path}' is not a leave table for this tile set")
+            values = array('f')
+            values.fromfile(f, TABLE_SIZE)
+        return cls(values)
+
+
+_default_table = {}
+
+
+def default_table() -> Optional[LeaveTable]:
+    """The table in leaves.bin next to this module, loaded once
+
+    The repository ships one built from dic.txt; rebuild it with
+    `python leaves.py <dictionary>` after changing the word list or tile
+    set. When it is missing or does not fit the tile set, a warning is
+    printed once and None is returned, and callers fall back to their own
+    estimates.
+    """
+    if 'table' not in _default_table:
+        table = None
+        try:
+            table = LeaveTable.load(LEAVES_FILE)
+        except (OSError, ValueError) as e:
+            print(f"Warning: no leave table loaded ({e}); leave values are disabled. "
+                  f"Build one with: python leaves.py <dictionary>", file=sys.stderr)
+        _default_table['table'] = table
+    return _default_table['table']
+
+
+def _leave_samples(seed: int) -> List[Tuple[str, int]]:
+    """Play one greedy game and pair each leave with the score its owner made next turn"""
+    from headless import HeadlessGame, greedy_policy
+    from simulate import worker_state
+
+    pending: Dict[int, str] = {}
+    samples = []
+
+    def recording_policy(game, moves, rack):
+        player = game.to_move
+        move = greedy_policy(game, moves, rack)
+        if player in pending:
+            samples.append((pending.pop(player), move.score if move else 0))
+        if move is not None:
+            leave = leave_after(rack, move)
+            if len(leave) <= MAX_LEAVE:
+                pending[player] = ''.join(leave)
+        return move
+
+    worker = worker_state()
+    HeadlessGame(worker['generator'], [recording_policy, recording_policy],
+                 worker['dictionary'], seed).play()
+    return samples
+
+
+def collect_samples(dict_file: str, games: int, seed: int = 0, workers: Optional[int] = None) -> Dict[str, List[float]]:
+    """Run self-play across a process pool; returns per-leave [sum, count] of next-turn scores"""
+    from simulate import init_worker
+
+    stats: Dict[str, List[float]] = {}
+    workers = workers or os.cpu_count() or 1
+    with Pool(workers, initializer=init_worker, initargs=(dict_file, ['greedy'])) as pool:
+        seeds = range(seed, seed + games)
+        for samples in pool.imap_unordered(_leave_samples, seeds, chunksize=max(1, games // (workers * 8))):
+            for leave, score in samples:
+                entry = stats.setdefault(''.join(sorted(leave)), [0.0, 0])
+                entry[0] += score
+                entry[1] += 1
+    return stats
+
+
+def fit_table(stats: Dict[str, List[float]], epochs: int = 20, rate: float = 0.01) -> LeaveTable:
+    """Turn observed next-turn scores into a full leave table
+
+    Leaves are valued relative to the average next-turn score. An additive
+    model (a weight for holding a first, second and third copy of each
+    letter) covers leaves never seen in self-play; observed means are
+    blended in with weight n / (n + PRIOR_SAMPLES).
+    """
+    total = sum(entry[0] for entry in stats.values())
+    count = sum(entry[1] for entry in stats.values())
+    baseline = total / count if count else 0.0
+
+    # Fit the additive model on per-leave means, weighted by sample count
+    weights = [[0.0] * 3 for _ in range(ALPHABET_SIZE)]
+    observations = []
+    for leave, (score_sum, n) in stats.items():
+        features = [(LETTER_INDEX[letter], copy) for letter, k in Counter(leave).items() for copy in range(min(k, 3))]
+        observations.append((features, score_sum / n - baseline, n))
+    for _ in range(epochs):
+        for features, target, n in observations:
+            error = target - sum(weights[code][copy] for code, copy in features)
+            step = rate * min(n, 50) * error
+            for code, copy in features:
+                weights[code][copy] += step / max(len(features), 1)
+
+    table = LeaveTable()
+    values = table.values
+    for codes in enumerate_leaves():
+        copies = Counter(codes)
+        estimate = sum(weights[code][copy] for code, k in copies.items() for copy in range(min(k, 3)))
+        leave = ''.join(LETTERS[code] for code in codes)
+        observed = stats.get(''.join(sorted(leave)))
+        if observed:
+            weight = observed[1] / (observed[1] + PRIOR_SAMPLES)
+            estimate += weight * (observed[0] / observed[1] - baseline - estimate)
+        values[leave_index(leave)] = estimate
+    return table
+
+
+def main():
+    """Entry point for building the leave table"""
+    parser = argparse.ArgumentParser(description="Estimate rack leave values by headless self-play")
+    parser.add_argument('dict_file', help="Dictionary file, one word per line")
+    parser.add_argument('--games', type=int, default=2000, help="Self-play games to sample")
+    parser.add_argument('--seed', type=int, default=0, help="Base seed; game i uses seed + i")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--out', default=LEAVES_FILE, help="Output table file")
+    args = parser.parse_args()
+
+    stats = collect_samples(args.dict_file, args.games, args.seed, args.workers)
+    table = fit_table(stats)
+    table.save(args.out)
+    print(f"{sum(entry[1] for entry in stats.values())} samples over {len(stats)} distinct leaves "
+          f"written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
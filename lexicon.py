@@ -0,0 +1,136 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from board_state import CODE_LETTERS, WORD_CODES
+
+# Key under which a trie node marks the end of a word; letter codes start at 1
+TERMINAL = 0
+# Pattern character matching any letter, e.g. a blank tile
+WILDCARD = '?'
+
+
+def encode_word(word: str) -> Optional[List[int]]:
+    """Convert a word to board letter codes, None if it uses a letter with no tiles
+
+    Case and variant spellings (e.g. cedilla Ş for Ș) map to the same codes.
+    """
+    codes = []
+    for letter in word:
+        code = WORD_CODES.get(letter)
+        if code is None:
+            return None
+        codes.append(code)
+    return codes
+
+
+def match_pattern(lexicon, pattern: str) -> List[str]:
+    """Every word, uppercase, spelled by the pattern with each '?' standing for any letter
+
+    Works on any lexicon exposing root, child, edges and is_terminal. Fixed
+    letters follow a single edge and wildcards fan out only over the edges
+    that exist, so each unknown costs one pass over a node's children
+    rather than one lookup per alphabet letter.
+    """
+    steps = []
+    for letter in pattern:
+        if letter == WILDCARD:
+            steps.append(None)
+        else:
+            code = WORD_CODES.get(letter)
+            if code is None:
+                return []
+            steps.append(code)
+
+    matches = []
+
+    def extend(node, depth: int, prefix: str):
+        if depth == len(steps):
+            if lexicon.is_terminal(node):
+                matches.append(prefix)
+            return
+        code = steps[depth]
+        if code is None:
+            for code, child in lexicon.edges(node):
+                extend(child, depth + 1, prefix + CODE_LETTERS[code])
+        else:
+            child = lexicon.child(node, code)
+            if child is not None:
+                extend(child, depth + 1, prefix + CODE_LETTERS[code])
+
+    extend(lexicon.root, 0, "")
+    return matches
+
+
+class Trie:
+    """Prefix tree over letter codes, the lookup structure used by move generation
+
+    Nodes are plain dicts mapping a letter code to the child node, with the
+    TERMINAL key present on nodes that end a word. Words are normalized once,
+    when they are encoded on the way in, so lookups only compare codes.
+    """
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.root: Dict[int, dict] = {}
+        self.word_count = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> bool:
+        """Add a word, returning False if it cannot be spelled with the tile set"""
+        codes = encode_word(word)
+        if not codes:
+            return False
+        node = self.root
+        for code in codes:
+            node = node.setdefault(code, {})
+        if TERMINAL not in node:
+            node[TERMINAL] = True
+            self.word_count += 1
+        return True
+
+    def child(self, node: dict, code: int) -> Optional[dict]:
+        return node.get(code)
+
+    def is_terminal(self, node: dict) -> bool:
+        return TERMINAL in node
+
+    def edges(self, node: dict) -> List[Tuple[int, dict]]:
+        """List (letter code, child) pairs leaving a node"""
+        return [(code, child) for code, child in node.items() if code]
+
+    def walk(self, codes: Iterable[int], node: Optional[dict] = None) -> Optional[dict]:
+        """Follow a sequence of letter codes, None if the path leaves the trie"""
+        if node is None:
+            node = self.root
+        for code in codes:
+            node = node.get(code)
+            if node is None:
+                return None
+        return node
+
+    def has_prefix(self, prefix: str) -> bool:
+        codes = encode_word(prefix)
+        return codes is not None and self.walk(codes) is not None
+
+    def match(self, pattern: str) -> List[str]:
+        """Words matching a pattern with '?' wildcards"""
+        return match_pattern(self, pattern)
+
+    def __contains__(self, word: str) -> bool:
+        codes = encode_word(word)
+        if codes is None:
+            return False
+        node = self.walk(codes)
+        return node is not None and TERMINAL in node
+
+    def __iter__(self) -> Iterator[str]:
+        """Yield every word, uppercase"""
+        stack = [(self.root, "")]
+        while stack:
+            node, prefix = stack.pop()
+            for code, child in reversed(self.edges(node)):
+                word = prefix + CODE_LETTERS[code]
+                if TERMINAL in child:
+                    yield word
+                stack.append((child, word))
+
+    def __len__(self) -> int:
+        return self.word_count
@@ -0,0 +1,351 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from board_state import BoardState, ALPHABET, BLANK_FLAG, CODE_MASK, CODE_LETTERS, LETTER_CODES, LETTER_VALUES
+from layout import BoardLayout, STANDARD
+from lexicon import Trie
+from tile import BLANK, Rack
+from transposition import position_key
+
+# Bitmask with every letter code allowed, used for squares without perpendicular words
+ALL_LETTERS = sum(1 << code for code in range(1, len(ALPHABET) + 1))
+COLUMN_NAMES = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+class Move(NamedTuple):
+    """A legal play: the tiles it puts down, the main word and its score"""
+    placements: Tuple[Tuple[Tuple[int, int], str], ...]
+    word: str
+    row: int
+    col: int
+    direction: str
+    score: int
+
+    def tiles(self) -> Dict[Tuple[int, int], str]:
+        """Get the placed tiles keyed by position, as accepted by BoardState.validate_move"""
+        return dict(self.placements)
+
+    def notation(self) -> str:
+        """Standard coordinate notation: row first for across plays, column first for down plays"""
+        column = COLUMN_NAMES[self.col]
+        if self.direction == 'horizontal':
+            return f"{self.row + 1}{column}"
+        return f"{column}{self.row + 1}"
+
+
+def find_anchors(cells: bytearray, first_move: bool, layout: BoardLayout = STANDARD) -> Set[int]:
+    """Empty squares next to a placed tile, or the centre square on an empty board"""
+    if first_move:
+        return {layout.center_index}
+    neighbours = layout.neighbours
+    anchors = set()
+    for index, code in enumerate(cells):
+        if code:
+            anchors.update(n for n in neighbours[index] if not cells[n])
+    return anchors
+
+
+def cross_check(cells: bytearray, lexicon, index: int, cross_step: int, size: int) -> Tuple[int, int]:
+    """Compute the letters allowed on an empty square given its perpendicular word
+
+    cross_step is 1 for a word along the row and size for one down the column.
+    Returns a bitmask of allowed letter codes and the face value of the
+    perpendicular letters, or -1 when the square has no perpendicular neighbours.
+    """
+    if cross_step == 1:
+        line_start = index - index % size
+        line_end = line_start + size - 1
+    else:
+        line_start = index % size
+        line_end = line_start + size * (size - 1)
+
+    prefix = []
+    i = index - cross_step
+    while i >= line_start and cells[i]:
+        prefix.append(cells[i])
+        i -= cross_step
+    prefix.reverse()
+
+    suffix = []
+    i = index + cross_step
+    while i <= line_end and cells[i]:
+        suffix.append(cells[i])
+        i += cross_step
+
+    if not prefix and not suffix:
+        return ALL_LETTERS, -1
+
+    cross_sum = sum(LETTER_VALUES[code] for code in prefix) + sum(LETTER_VALUES[code] for code in suffix)
+    mask = 0
+    node = lexicon.walk(code & CODE_MASK for code in prefix)
+    if node is not None:
+        suffix = [code & CODE_MASK for code in suffix]
+        for code, child in lexicon.edges(node):
+            end = lexicon.walk(suffix, child)
+            if end is not None and lexicon.is_terminal(end):
+                mask |= 1 << code
+    return mask, cross_sum
+
+
+def compute_cross_checks(cells: bytearray, lexicon, direction: str, size: int) -> Tuple[List[int], List[int]]:
+    """Cross-check masks and sums for every empty square, for plays in the given direction"""
+    cross_step = size if direction == 'horizontal' else 1
+    masks = [0] * len(cells)
+    sums = [-1] * len(cells)
+    for index, code in enumerate(cells):
+        if not code:
+            masks[index], sums[index] = cross_check(cells, lexicon, index, cross_step, size)
+    return masks, sums
+
+
+class CrossChecks:
+    """Cross-check masks, cross sums and anchors kept up to date as tiles are committed
+
+    BoardState calls update() with the squares a move changed, and only the
+    squares at the ends of the rows and columns through them are recomputed.
+    """
+
+    def __init__(self, state: BoardState, lexicon):
+        self.state = state
+        self.lexicon = lexicon
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute everything from the current board"""
+        cells = self.state.cells
+        self.masks = {}
+        self.sums = {}
+        for direction in ('horizontal', 'vertical'):
+            self.masks[direction], self.sums[direction] = compute_cross_checks(
+                cells, self.lexicon, direction, self.state.size)
+        self.anchors = find_anchors(cells, self.state.first_move, self.state.layout)
+
+    def update(self, positions: Iterable[Tuple[int, int]]):
+        """Refresh the cache after tiles were placed on or removed from the given squares"""
+        cells = self.state.cells
+        layout = self.state.layout
+        size = layout.size
+        lexicon = self.lexicon
+        masks_h, sums_h = self.masks['horizontal'], self.sums['horizontal']
+        masks_v, sums_v = self.masks['vertical'], self.sums['vertical']
+        touched = set()
+
+        for row, col in positions:
+            index = row * size + col
+            touched.add(index)
+            if cells[index]:
+                masks_h[index], sums_h[index] = 0, -1
+                masks_v[index], sums_v[index] = 0, -1
+            else:
+                masks_h[index], sums_h[index] = cross_check(cells, lexicon, index, size, size)
+                masks_v[index], sums_v[index] = cross_check(cells, lexicon, index, 1, size)
+
+            # The first empty square past each end of the runs through this square
+            for step, limit, vertical in ((-size, row, True), (size, size - 1 - row, True),
+                                          (-1, col, False), (1, size - 1 - col, False)):
+                i = index
+                for _ in range(limit):
+                    i += step
+                    if not cells[i]:
+                        if vertical:
+                            masks_h[i], sums_h[i] = cross_check(cells, lexicon, i, size, size)
+                        else:
+                            masks_v[i], sums_v[i] = cross_check(cells, lexicon, i, 1, size)
+                        break
+                if limit:
+                    touched.add(index + step)
+
+        # Anchor status can only change on the touched squares and their neighbours
+        anchors = self.anchors
+        center = layout.center_index
+        if self.state.first_move:
+            anchors.clear()
+            anchors.add(center)
+            return
+        touched.add(center)
+        neighbours = layout.neighbours
+        for index in touched:
+            if not cells[index] and any(cells[n] for n in neighbours[index]):
+                anchors.add(index)
+            else:
+                anchors.discard(index)
+
+
+class MoveGenerator:
+    """Lists every legal play for a rack using anchor squares and cross-checks (Appel-Jacobson)"""
+
+    def __init__(self, lexicon, table=None):
+        self.lexicon = lexicon
+        self.table = table  # Optional transposition.TranspositionTable of move lists by position
+
+    @classmethod
+    def from_dictionary(cls, dictionary: Iterable[str], table=None) -> 'MoveGenerator':
+        """Build a generator over the loaded dictionary, reusing it if it is already compiled"""
+        if hasattr(dictionary, 'edges'):
+            return cls(dictionary, table)
+        return cls(Trie(dictionary), table)
+
+    def generate(self, state: BoardState, rack: Iterable[str]) -> List[Move]:
+        """Return every legal move for the rack letters with its exact score
+
+        With a transposition table, a position seen before returns the stored
+        list, which callers must not modify.
+        """
+        if self.table is not None:
+            if not isinstance(rack, Rack):
+                rack = list(rack)
+            key = position_key(state, rack)
+            moves = self.table.get(key)
+            if moves is None:
+                moves = self._generate(state, rack)
+                self.table.put(key, moves)
+            return moves
+        return self._generate(state, rack)
+
+    def _generate(self, state: BoardState, rack: Iterable[str]) -> List[Move]:
+        if isinstance(rack, Rack):
+            # Rack counts are in alphabet order, and letter codes start at 1
+            rack_counts = [0] + rack.counts
+        else:
+            rack_counts = [0] * (len(ALPHABET) + 1)  # Blanks are counted under the code of '*'
+            for letter in rack:
+                code = LETTER_CODES.get(letter)
+                if code:
+                    rack_counts[code] += 1
+
+        # Reuse the board's incremental cache when it was built for this lexicon
+        cache = state.cross_checks
+        if cache is None or cache.lexicon is not self.lexicon:
+            cache = CrossChecks(state, self.lexicon)
+
+        moves = []
+        for direction in ('horizontal', 'vertical'):
+            self._generate_direction(state.cells, state.layout, direction, cache.anchors,
+                                     cache.masks[direction], cache.sums[direction], rack_counts, moves)
+        return moves
+
+    def attach(self, state: BoardState) -> CrossChecks:
+        """Give a board an incremental cross-check cache for this generator's lexicon"""
+        state.cross_checks = CrossChecks(state, self.lexicon)
+        return state.cross_checks
+
+    def best_move(self, state: BoardState, rack: Iterable[str]) -> Optional[Move]:
+        """Return the highest scoring move, None if there is no legal play"""
+        moves = self.generate(state, rack)
+        if not moves:
+            return None
+        return max(moves, key=lambda move: move.score)
+
+    def _generate_direction(self, cells, layout, direction, anchors, masks, sums, rack_counts, moves):
+        lexicon = self.lexicon
+        size = layout.size
+        letter_multipliers = layout.letter_multipliers
+        word_multipliers = layout.word_multipliers
+        child_of = lexicon.child
+        edges = lexicon.edges
+        is_terminal = lexicon.is_terminal
+        horizontal = direction == 'horizontal'
+        step = 1 if horizontal else size
+        blank = LETTER_CODES[BLANK]
+
+        for line in range(size):
+            line_start = line * size if horizontal else line
+
+            def record(placed, start, end):
+                # Single tiles forming words both ways are only reported as across plays
+                if not horizontal and len(placed) == 1 and sums[placed[0][0]] >= 0:
+                    return
+                new_tiles = dict(placed)
+                main_score = 0
+                word_multiplier = 1
+                cross_score = 0
+                word = ""
+                index = line_start + start * step
+                for _ in range(start, end):
+                    code = new_tiles.get(index)
+                    if code is None:
+                        code = cells[index]
+                        main_score += LETTER_VALUES[code]
+                    else:
+                        letter_score = LETTER_VALUES[code] * letter_multipliers[index]
+                        main_score += letter_score
+                        word_multiplier *= word_multipliers[index]
+                        if sums[index] >= 0:
+                            cross_score += (sums[index] + letter_score) * word_multipliers[index]
+                    word += CODE_LETTERS[code]
+                    index += step
+                if horizontal:
+                    row, col = line, start
+                else:
+                    row, col = start, line
+                moves.append(Move(
+                    tuple((divmod(index, size), CODE_LETTERS[code]) for index, code in placed),
+                    word, row, col, direction, main_score * word_multiplier + cross_score))
+
+            def extend_right(node, pos, placed, start, anchor_pos):
+                if pos < size:
+                    index = line_start + pos * step
+                    code = cells[index]
+                    if code:
+                        child = child_of(node, code & CODE_MASK)
+                        if child is not None:
+                            extend_right(child, pos + 1, placed, start, anchor_pos)
+                        return
+                    if pos > anchor_pos and pos - start > 1 and is_terminal(node):
+                        record(placed, start, pos)
+                    mask = masks[index]
+                    for code, child in edges(node):
+                        if not mask >> code & 1:
+                            continue
+                        if rack_counts[code]:
+                            rack_counts[code] -= 1
+                            placed.append((index, code))
+                            extend_right(child, pos + 1, placed, start, anchor_pos)
+                            placed.pop()
+                            rack_counts[code] += 1
+                        if rack_counts[blank]:
+                            rack_counts[blank] -= 1
+                            placed.append((index, code | BLANK_FLAG))
+                            extend_right(child, pos + 1, placed, start, anchor_pos)
+                            placed.pop()
+                            rack_counts[blank] += 1
+                elif pos > anchor_pos and pos - start > 1 and is_terminal(node):
+                    record(placed, start, pos)
+
+            def left_part(node, left, limit, anchor_pos):
+                start = anchor_pos - len(left)
+                placed = [(line_start + (start + i) * step, code) for i, code in enumerate(left)]
+                extend_right(node, anchor_pos, placed, start, anchor_pos)
+                if limit > 0:
+                    for code, child in edges(node):
+                        if rack_counts[code]:
+                            rack_counts[code] -= 1
+                            left.append(code)
+                            left_part(child, left, limit - 1, anchor_pos)
+                            left.pop()
+                            rack_counts[code] += 1
+                        if rack_counts[blank]:
+                            rack_counts[blank] -= 1
+                            left.append(code | BLANK_FLAG)
+                            left_part(child, left, limit - 1, anchor_pos)
+                            left.pop()
+                            rack_counts[blank] += 1
+
+            for pos in range(size):
+                index = line_start + pos * step
+                if index not in anchors:
+                    continue
+                if pos > 0 and cells[index - step]:
+                    # Extend the tiles already on the board to the left of the anchor
+                    start = pos
+                    while start > 0 and cells[line_start + (start - 1) * step]:
+                        start -= 1
+                    node = lexicon.walk(cells[line_start + p * step] & CODE_MASK for p in range(start, pos))
+                    if node is not None:
+                        extend_right(node, pos, [], start, pos)
+                else:
+                    # Build left parts over the empty, non-anchor squares before the anchor
+                    limit = 0
+                    p = pos - 1
+                    while p >= 0 and line_start + p * step not in anchors and not cells[line_start + p * step]:
+                        limit += 1
+                        p -= 1
+                    left_part(lexicon.root, [], limit, pos)
@@ -0,0 +1,141 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from movegen import COLUMN_NAMES
+
+PLAY = 'play'
+EXCHANGE = 'exchange'
+PASS = 'pass'
+
+
+class LoggedMove(NamedTuple):
+    """One turn: exactly what changed, so it can be undone or redone without copying the game
+
+    Letters are stored one character per tile, blanks in lowercase as on
+    the board, and squares as (row, col) positions so any board size fits.
+    """
+    player: int
+    kind: str  # PLAY, EXCHANGE or PASS
+    squares: Tuple[Tuple[int, int], ...] = ()  # Positions of the placed tiles
+    letters: str = ""  # Placed letters, or the letters put back by an exchange
+    score: int = 0
+    drawn: str = ""  # Letters drawn from the bag afterwards
+
+    def placements(self) -> Dict[Tuple[int, int], str]:
+        """The placed tiles keyed by position, as accepted by BoardState.commit_move"""
+        return dict(zip(self.squares, self.letters))
+
+    def notation(self) -> str:
+        """One line of game notation, e.g. '0 play H8=C,I8=a 12 AEI'"""
+        if self.kind == PLAY:
+            tiles = ",".join(f"{square_name(*square)}={letter}" for square, letter in zip(self.squares, self.letters))
+            return f"{self.player} {PLAY} {tiles} {self.score} {self.drawn or '-'}"
+        if self.kind == EXCHANGE:
+            return f"{self.player} {EXCHANGE} {self.letters} {self.drawn or '-'}"
+        return f"{self.player} {PASS}"
+
+    @classmethod
+    def parse(cls, line: str) -> 'LoggedMove':
+        """Read a move written by notation()"""
+        fields = line.split()
+        player, kind = int(fields[0]), fields[1]
+        if kind == PLAY:
+            squares = []
+            letters = ""
+            for tile in fields[2].split(","):
+                name, letter = tile.split("=")
+                squares.append(square_position(name))
+                letters += letter
+            return cls(player, PLAY, tuple(squares), letters, int(fields[3]), _drawn(fields[4]))
+        if kind == EXCHANGE:
+            return cls(player, EXCHANGE, letters=fields[2], drawn=_drawn(fields[3]))
+        if kind == PASS:
+            return cls(player, PASS)
+        raise ValueError(f"Unknown move kind '{kind}'")
+
+
+def square_name(row: int, col: int) -> str:
+    """Column letter then 1-based row, e.g. 'H8' for the centre of the standard board"""
+    return f"{COLUMN_NAMES[col]}{row + 1}"
+
+
+def square_position(name: str) -> Tuple[int, int]:
+    """Read square_name(); whether the square is on the board is left to the board's layout"""
+    try:
+        row, col = int(name[1:]) - 1, COLUMN_NAMES.index(name[0])
+    except ValueError:
+        raise ValueError(f"Bad square '{name}'") from None
+    if row < 0:
+        raise ValueError(f"Bad square '{name}'")
+    return row, col
+
+
+def _drawn(field: str) -> str:
+    return "" if field == '-' else field
+
+
+class MoveLog:
+    """Every committed move of a game, with a cursor for undo and redo
+
+    Moves after the cursor have been undone and can be redone. Recording a
+    move that differs from the next undone one discards the redo history;
+    recording the same move again (which is how redo replays it) just
+    advances the cursor.
+
+    Undo and redo are carried out by HeadlessGame. The Qt window records
+    its games in a MoveLog so they can be saved, but offers no undo.
+    """
+
+    def __init__(self, deal: Iterable[str] = ()):
+        self.deal: List[str] = list(deal)  # Letters each player was dealt at the start
+        self.moves: List[LoggedMove] = []
+        self.cursor = 0
+
+    def record(self, move: LoggedMove):
+        if self.cursor < len(self.moves) and self.moves[self.cursor] == move:
+            self.cursor += 1
+            return
+        del self.moves[self.cursor:]
+        self.moves.append(move)
+        self.cursor += 1
+
+    def can_undo(self) -> bool:
+        return self.cursor > 0
+
+    def can_redo(self) -> bool:
+        return self.cursor < len(self.moves)
+
+    def step_back(self) -> LoggedMove:
+        """Move the cursor back over the last played move and return it"""
+        self.cursor -= 1
+        return self.moves[self.cursor]
+
+    def next_move(self) -> Optional[LoggedMove]:
+        """The move redo would replay, None if there is none"""
+        return self.moves[self.cursor] if self.can_redo() else None
+
+    def played(self) -> List[LoggedMove]:
+        """Moves up to the cursor"""
+        return self.moves[:self.cursor]
+
+    def scoreless_run(self) -> int:
+        """Passes and exchanges in a row at the cursor"""
+        run = 0
+        while run < self.cursor and self.moves[self.cursor - run - 1].kind != PLAY:
+            run += 1
+        return run
+
+    def to_text(self) -> str:
+        """Game notation: a 'deal' line with each rack, then one played move per line"""
+        lines = ["deal " + " ".join(rack or '-' for rack in self.deal)]
+        lines.extend(move.notation() for move in self.played())
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def from_text(cls, text: str) -> 'MoveLog':
+        """Read notation written by to_text(); the moves load as redoable, with the cursor at the start"""
+        lines = [line for line in text.splitlines() if line.strip() and not line.startswith('#')]
+        if not lines or not lines[0].startswith('deal '):
+            raise ValueError("Game notation must start with a 'deal' line")
+        log = cls(_drawn(rack) for rack in lines[0].split()[1:])
+        log.moves = [LoggedMove.parse(line) for line in lines[1:]]
+        return log
+
@@ -0,0 +1,200 @@
+import functools
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from board_state import BoardState, MovePreview
+from endgame import EndgameSolver
+from movegen import MoveGenerator
+from tile import TileSystem
+
+# (class, method, operation name) wrapped while profiling is enabled
+HOT_PATHS: List[Tuple[type, str, str]] = [
+    (BoardState, 'validate_move', 'board.validate_move'),
+    (BoardState, 'get_word_at_position', 'board.get_word_at_position'),
+    (BoardState, 'is_valid_word', 'dictionary.lookup'),
+    (BoardState, 'calculate_word_score', 'board.calculate_word_score'),
+    (MovePreview, 'evaluate', 'preview.evaluate'),
+    (TileSystem, 'draw_letters', 'bag.draw'),
+    (TileSystem, 'return_letters', 'bag.return'),
+    (TileSystem, 'take_letters', 'bag.take'),
+    (MoveGenerator, 'generate', 'movegen.generate'),
+    (EndgameSolver, 'solve', 'endgame.solve'),
+]
+
+# Counters derived from an operation's result
+RESULT_COUNTERS: Dict[str, Tuple[str, Callable[[object], int]]] = {
+    'movegen.generate': ('movegen.moves', len),
+    'bag.draw': ('bag.tiles_drawn', len),
+    'endgame.solve': ('endgame.nodes', lambda result: result.nodes),
+}
+
+
+class ProfileStats:
+    """Timers and counters for one scope, such as a game or the whole process
+
+    A timer holds [calls, total seconds, slowest call in seconds].
+    """
+
+    def __init__(self):
+        self.timers: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+
+    def add_time(self, name: str, seconds: float, calls: int = 1, slowest: Optional[float] = None):
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = [0, 0.0, 0.0]
+        timer[0] += calls
+        timer[1] += seconds
+        timer[2] = max(timer[2], seconds if slowest is None else slowest)
+
+    def add_count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, other: 'ProfileStats'):
+        for name, (calls, total, slowest) in other.timers.items():
+            self.add_time(name, total, int(calls), slowest)
+        for name, amount in other.counters.items():
+            self.add_count(name, amount)
+
+    def to_dict(self) -> Dict:
+        return {
+            'timers': {name: {'calls': int(calls), 'seconds': round(total, 6),
+                              'mean_us': round(total / calls * 1e6, 2) if calls else 0.0,
+                              'max_us': round(slowest * 1e6, 2)}
+                       for name, (calls, total, slowest) in sorted(self.timers.items())},
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ProfileStats':
+        stats = cls()
+        for name, timer in data.get('timers', {}).items():
+            stats.add_time(name, timer['seconds'], timer['calls'], timer['max_us'] / 1e6)
+        for name, amount in data.get('counters', {}).items():
+            stats.add_count(name, amount)
+        return stats
+
+
+class Profiler:
+    """Opt-in timing of the rules, dictionary, bag and search hot paths
+
+    Enabling wraps the methods listed in HOT_PATHS on their classes, and
+    disabling restores them, so nothing is measured (or slowed down) until
+    profiling is switched on. Every call is added to the process-wide
+    totals and to the current game's, which start_game() resets.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.process = ProfileStats()
+        self.game = ProfileStats()
+        self._originals: Dict[Tuple[type, str], Callable] = {}
+        self._lock = threading.Lock()  # Searches also run on the compute worker
+
+    def enable(self):
+        if self.enabled:
+            return
+        for cls, method, name in HOT_PATHS:
+            original = cls.__dict__[method]
+            self._originals[(cls, method)] = original
+            setattr(cls, method, self._timed(original, name))
+        self.enabled = True
+
+    def disable(self):
+        for (cls, method), original in self._originals.items():
+            setattr(cls, method, original)
+        self._originals.clear()
+        self.enabled = False
+
+    def start_game(self):
+        """Begin the per-game totals afresh"""
+        with self._lock:
+            self.game = ProfileStats()
+
+    def reset(self):
+        with self._lock:
+            self.process = ProfileStats()
+            self.game = ProfileStats()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.process.add_time(name, seconds)
+            self.game.add_time(name, seconds)
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.process.add_count(name, amount)
+            self.game.add_count(name, amount)
+
+    def _timed(self, function: Callable, name: str) -> Callable:
+        counter = RESULT_COUNTERS.get(name)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+            if counter is not None:
+                self.count(counter[0], counter[1](result))
+            return result
+        return wrapper
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {'process': self.process.to_dict(), 'game': self.game.to_dict()}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Text exposition format, one series per operation and scope"""
+        data = self.to_dict()
+        lines = [
+            "# HELP scrabble_operation_seconds Time spent in instrumented operations",
+            "# TYPE scrabble_operation_seconds summary",
+        ]
+        for scope, stats in data.items():
+            for name, timer in stats['timers'].items():
+                labels = f'{{operation="{name}",scope="{scope}"}}'
+                lines.append(f"scrabble_operation_seconds_sum{labels} {timer['seconds']}")
+                lines.append(f"scrabble_operation_seconds_count{labels} {timer['calls']}")
+        lines += [
+            "# HELP scrabble_operation_max_seconds Slowest single call of an operation",
+            "# TYPE scrabble_operation_max_seconds gauge",
+        ]
+        for scope, stats in data.items():
+            for name, timer in stats['timers'].items():
+                lines.append(f'scrabble_operation_max_seconds{{operation="{name}",scope="{scope}"}} '
+                             f"{round(timer['max_us'] / 1e6, 9)}")
+        lines += [
+            "# HELP scrabble_events_total Counted events",
+            "# TYPE scrabble_events_total counter",
+        ]
+        for scope, stats in data.items():
+            for name, amount in stats['counters'].items():
+                lines.append(f'scrabble_events_total{{counter="{name}",scope="{scope}"}} {amount}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self, scope: str = 'game') -> str:
+        """Plain-text table of the slowest operations, for display"""
+        stats = self.to_dict()[scope]
+        rows = sorted(stats['timers'].items(), key=lambda item: -item[1]['seconds'])
+        lines = [f"{'operation':<28}{'calls':>8}{'total ms':>11}{'mean us':>10}{'max us':>10}"]
+        for name, timer in rows:
+            lines.append(f"{name:<28}{timer['calls']:>8}{timer['seconds'] * 1000:>11.1f}"
+                         f"{timer['mean_us']:>10.1f}{timer['max_us']:>10.1f}")
+        for name, amount in stats['counters'].items():
+            lines.append(f"{name:<28}{amount:>8}")
+        return '\n'.join(lines)
+
+    def export(self, path: str):
+        """Write the totals, as Prometheus text for .prom/.txt files and JSON otherwise"""
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+PROFILER = Profiler()
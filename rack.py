@@ -1,6 +1,6 @@
 from PyQt5.QtWidgets import QWidget, QHBoxLayout
 from PyQt5.QtCore import Qt
-from tile import ScrabbleTile, TileSystem
+from tile import TILES, Rack, tile_letter
 from cell import ScrabbleCell
 
 class TileRack(QWidget):
@@ -81,13 +81,13 @@ class TileRack(QWidget):
     def return_tile(self, letter):
         """Return a tile to the first empty position in the rack"""
         if letter:
-            tile_info = TileSystem.TILE_DISTRIBUTION.get(letter)
-            if tile_info:
+            letter = tile_letter(letter)  # A blank comes back as a blank
+            tile = TILES.get(letter)
+            if tile:
                 # Find first empty position
                 for i in range(len(self.tiles)):
                     if self.tiles[i] is None:
-                        # Create new tile and add to rack
-                        self.tiles[i] = ScrabbleTile(letter, tile_info['value'])
+                        self.tiles[i] = tile
                         self.tile_widgets[i].setLetter(letter)
                         break
 
@@ -116,12 +116,33 @@ class TileRack(QWidget):
         """Get list of all tiles currently in rack"""
         return [tile for tile in self.tiles if tile is not None]
 
+    def get_rack(self) -> Rack:
+        """The rack's letters as a compact Rack for the engine"""
+        return Rack(tile.letter for tile in self.tiles if tile is not None)
+
+    def set_rack(self, rack: Rack):
+        """Show the letters of a compact Rack, replacing the current tiles"""
+        self.clear_rack()
+        self.add_tiles([TILES[letter] for letter in rack])
+
     def get_selected_tiles(self):
         """Get list of tiles selected for exchange"""
         if self.exchange_mode:
             return [self.tiles[i] for i in self.selected_tiles if self.tiles[i] is not None]
         return []
 
+    def select_for_exchange(self, letters):
+        """Select the tiles holding these letters, e.g. as suggested by the exchange advisor"""
+        if not self.exchange_mode:
+            return
+        self.clear_selection()
+        remaining = list(letters)
+        for i, tile in enumerate(self.tiles):
+            if tile is not None and tile.letter in remaining:
+                remaining.remove(tile.letter)
+                self.selected_tiles.add(i)
+                self.tile_widgets[i].setSelected(True)
+
     def exchange_tiles(self, old_tiles, new_tiles):
         """Exchange selected tiles for new ones"""
         # Remove old tiles
@@ -1,35 +1,62 @@
 import sys
-from PyQt5.QtWidgets import QApplication, QMessageBox
-from game import ScrabbleGame
-from utils import load_dictionary
+from startup import StartupTrace
+
+# Created first so the trace covers the imports below
+trace = StartupTrace()
+with trace.phase("imports"):
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    from PyQt5.QtCore import QTimer
+    from game import ScrabbleGame
+    from language import LANGUAGE
+    from layout import STANDARD, get_layout
+
+def report_startup(trace_startup: bool):
+    """Print the startup trace when asked for, or when the window took too long to appear"""
+    trace.mark("dictionary ready")
+    if trace_startup or trace.over_budget("window shown"):
+        print(trace.report())
+        if trace.over_budget("window shown"):
+            print(f"Warning: startup took longer than {trace.budget:.1f} s")
 
 def main():
     """Main entry point for the Scrabble game"""
     # Check command line arguments
-    if len(sys.argv) != 2:
-        print("Usage: python scrabble.py <dict_file>")
+    args = sys.argv[1:]
+    trace_startup = "--trace-startup" in args
+    if trace_startup:
+        args.remove("--trace-startup")
+    layout = STANDARD
+    if "--layout" in args:
+        position = args.index("--layout")
+        try:
+            layout = get_layout(args[position + 1])
+        except (IndexError, ValueError, KeyError, OSError) as e:
+            print(f"Bad board layout: {e}")
+            sys.exit(1)
+        del args[position:position + 2]
+    if len(args) > 1 or (not args and LANGUAGE.dictionary is None):
+        print("Usage: python scrabble.py [dict_file] [--layout standard|super|layout.json] [--trace-startup]")
         sys.exit(1)
 
-    # Get dictionary file path
-    dict_file = sys.argv[1]
-    
+    # Get dictionary file path, defaulting to the language pack's word list
+    dict_file = args[0] if args else LANGUAGE.dictionary_path()
+
     try:
         # Create application
         app = QApplication(sys.argv)
-        
-        # Load dictionary
-        dictionary = load_dictionary(dict_file)
-        if not dictionary:
-            QMessageBox.critical(None, "Error", "The dictionary is empty!")
-            sys.exit(1)
-            
-        # Create and show game
-        game = ScrabbleGame(dictionary)
-        game.show()
-        
+
+        # Create and show game right away; the dictionary loads in the background
+        with trace.phase("ui"):
+            game = ScrabbleGame(layout=layout)
+            game.dictionary_ready.connect(lambda: report_startup(trace_startup))
+            game.show()
+        QTimer.singleShot(0, lambda: trace.mark("window shown"))
+        game.load_dictionary(dict_file, trace)
+
         # Start application event loop
-        sys.exit(app.exec_())
-        
+        status = app.exec_()
+        sys.exit(status if game.dictionary is not None else 1)
+
     except Exception as e:
         QMessageBox.critical(None, "Error", f"An error occurred: {str(e)}")
         sys.exit(1)
@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+from collections import deque
+from typing import Dict, Optional, Set, Tuple
+from board_state import TILE_CODES
+from headless import HeadlessGame
+from language import fold_variants
+from layout import LAYOUTS
+from tile import BLANK
+from utils import load_compiled_dictionary
+
+MAX_LINE = 64 * 1024  # Longest request line accepted
+LATENCY_WINDOW = 10000  # Move validations kept for latency statistics
+
+
+class ProtocolError(Exception):
+    """A request that cannot be served; its message is sent back to the client"""
+
+
+class GameServer:
+    """Hosts many concurrent games over a line-delimited JSON protocol
+
+    Each request is one JSON object per line with an 'op' field and an
+    optional 'id' that is echoed back. Responses carry 'ok' plus either the
+    result fields or an 'error' message. Ops:
+
+        new_game   {"players": 2, "seed": null, "layout": "standard"} -> {"game", "seat"}
+        join       {"game"}                         -> {"seat"}
+        state      {"game", "seat"}                 -> board, scores, rack, ...
+        play       {"game", "seat", "tiles": [[row, col, letter], ...]} -> {"score"}
+                   (a blank is played as the lowercase letter it stands for)
+        exchange   {"game", "seat", "letters": [...]}
+        pass       {"game", "seat"}
+        stats      {}                               -> server counters and latency
+
+    All games share one read-only dictionary. Requests are handled one at a
+    time on the event loop, and each is bounded by the cost of validating
+    a single move, so no game can stall the others.
+    """
+
+    def __init__(self, dictionary, max_games: int = 100000, idle_timeout: float = 3600.0):
+        self.dictionary = dictionary
+        self.max_games = max_games
+        self.idle_timeout = idle_timeout
+        self.games: Dict[int, HeadlessGame] = {}
+        self.seats_taken: Dict[int, int] = {}
+        self.last_active: Dict[int, float] = {}
+        self.game_ids = itertools.count(1)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.connections = 0
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one connection until it closes"""
+        self.connections += 1
+        seats: Set[Tuple[int, int]] = set()  # (game, seat) pairs owned by this connection
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(self._encode({'ok': False, 'error': 'Request line too long'}))
+                    break
+                if not line:
+                    break
+                writer.write(self._encode(self.handle_line(line, seats)))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    def handle_line(self, line: bytes, seats: Set[Tuple[int, int]]) -> Dict:
+        """Decode and dispatch one request line"""
+        self.requests += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ProtocolError("Request must be a JSON object")
+            request_id = request.get('id')
+            handler = getattr(self, f"op_{request.get('op')}", None)
+            if handler is None:
+                raise ProtocolError(f"Unknown op '{request.get('op')}'")
+            response = {'ok': True}
+            response.update(handler(request, seats))
+        except ProtocolError as e:
+            response = {'ok': False, 'error': str(e)}
+        except (ValueError, TypeError, KeyError) as e:
+            response = {'ok': False, 'error': f"Malformed request: {e}"}
+        if request_id is not None:
+            response['id'] = request_id
+        return response
+
+    @staticmethod
+    def _encode(response: Dict) -> bytes:
+        return (json.dumps(response, ensure_ascii=False) + "\n").encode('utf-8')
+
+    def _game(self, request: Dict) -> Tuple[int, HeadlessGame]:
+        game_id = int(request['game'])
+        game = self.games.get(game_id)
+        if game is None:
+            raise ProtocolError(f"No game {game_id}")
+        self.last_active[game_id] = time.monotonic()
+        return game_id, game
+
+    def _seat(self, request: Dict, seats: Set[Tuple[int, int]], to_move: bool = True) -> Tuple[int, HeadlessGame]:
+        """Get the game for a request from a seat this connection owns"""
+        game_id, game = self._game(request)
+        seat = int(request['seat'])
+        if (game_id, seat) not in seats:
+            raise ProtocolError(f"Seat {seat} of game {game_id} does not belong to this connection")
+        if to_move:
+            if game.finished:
+                raise ProtocolError("Game is over")
+            if game.to_move != seat:
+                raise ProtocolError("Not your turn")
+        return seat, game
+
+    def _evict_idle(self):
+        """Drop finished or idle games when the server is full"""
+        now = time.monotonic()
+        for game_id in list(self.games):
+            if self.games[game_id].finished or now - self.last_active[game_id] > self.idle_timeout:
+                del self.games[game_id]
+                del self.seats_taken[game_id]
+                del self.last_active[game_id]
+
+    def op_new_game(self, request: Dict, seats: Set[Tuple[int, int]]) -> Dict:
+        players = int(request.get('players', 2))
+        if not 1 <= players <= 4:
+            raise ProtocolError("A game has 1 to 4 players")
+        if len(self.games) >= self.max_games:
+            self._evict_idle()
+            if len(self.games) >= self.max_games:
+                raise ProtocolError("Server is full")
+        layout = LAYOUTS.get(request.get('layout', 'standard'))
+        if layout is None:
+            raise ProtocolError(f"Unknown layout; choose from {', '.join(LAYOUTS)}")
+        game_id = next(self.game_ids)
+        self.games[game_id] = HeadlessGame(None, [None] * players, self.dictionary, request.get('seed'),
+                                           layout=layout)
+        self.seats_taken[game_id] = 1
+        self.last_active[game_id] = time.monotonic()
+        seats.add((game_id, 0))
+        return {'game': game_id, 'seat': 0}
+
+    def op_join(self, request: Dict, seats: Set[Tuple[int, int]]) -> Dict:
+        game_id, game = self._game(request)
+        seat = self.seats_taken[game_id]
+        if seat >= len(game.racks):
+            raise ProtocolError(f"Game {game_id} is full")
+        self.seats_taken[game_id] = seat + 1
+        seats.add((game_id, seat))
+        return {'game': game_id, 'seat': seat}
+
+    def op_state(self, request: Dict, seats: Set[Tuple[int, int]]) -> Dict:
+        seat, game = self._seat(request, seats, to_move=False)
+        return {
+            'layout': game.state.layout.name,
+            'size': game.state.size,
+            'tiles': [[row, col, letter] for (row, col), letter in game.state.get_tiles().items()],
+            'rack': game.racks[seat],
+            'scores': game.scores,
+            'to_move': game.to_move,
+            'bag': game.tile_system.remaining_tiles(),
+            'finished': game.finished,
+            'game_over': game.game_over,
+        }
+
+    def op_play(self, request: Dict, seats: Set[Tuple[int, int]]) -> Dict:
+        seat, game = self._seat(request, seats)
+        placements = {}
+        for row, col, letter in request['tiles']:
+            row, col = int(row), int(col)
+            if not game.state.layout.contains(row, col) or (row, col) in placements:
+                raise ProtocolError(f"Bad square {(row, col)}")
+            if not game.state.is_empty(row, col):
+                raise ProtocolError(f"Square {(row, col)} is occupied")
+            letter = fold_variants(str(letter))
+            if letter not in TILE_CODES or letter == BLANK:
+                raise ProtocolError(f"Bad letter {letter!r}; play blanks as lowercase letters")
+            placements[(row, col)] = letter
+
+        start = time.perf_counter()
+        score = game.play_move(placements)
+        self.latencies.append(time.perf_counter() - start)
+        if score is None:
+            raise ProtocolError("Invalid move")
+        return {'score': score, 'rack': game.racks[seat], 'finished': game.finished}
+
+    def op_exchange(self, request: Dict, seats: Set[Tuple[int, int]]) -> Dict:
+        seat, game = self._seat(request, seats)
+        if not game.exchange([fold_variants(str(letter)) for letter in request['letters']]):
+            raise ProtocolError("Exchange not allowed")
+        return {'rack': game.racks[seat], 'finished': game.finished}
+
+    def op_pass(self, request: Dict, seats: Set[Tuple[int, int]]) -> Dict:
+        _, game = self._seat(request, seats)
+        game.pass_turn()
+        return {'finished': game.finished}
+
+    def op_stats(self, request: Dict, seats: Set[Tuple[int, int]]) -> Dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1e6, 1)
+
+        return {
+            'games': len(self.games),
+            'connections': self.connections,
+            'requests': self.requests,
+            'validate_p50_us': percentile(0.50),
+            'validate_p99_us': percentile(0.99),
+            'validate_max_us': round(latencies[-1] * 1e6, 1) if latencies else None,
+        }
+
+
+async def serve(dictionary, host: str = '127.0.0.1', port: int = 8765, unix_path: Optional[str] = None):
+    """Run the server until cancelled"""
+    server = GameServer(dictionary)
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.handle_client, path=unix_path, limit=MAX_LINE)
+    else:
+        listener = await asyncio.start_server(server.handle_client, host, port, limit=MAX_LINE)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    """Entry point for the game server"""
+    parser = argparse.ArgumentParser(description="Host Scrabble games over line-delimited JSON")
+    parser.add_argument('dict_file', help="Dictionary file, one word per line")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on (default 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="TCP port (default 8765)")
+    parser.add_argument('--unix', help="Listen on a Unix socket at this path instead of TCP")
+    args = parser.parse_args()
+
+    dictionary = load_compiled_dictionary(args.dict_file)
+    if not dictionary:
+        sys.exit(1)
+    try:
+        asyncio.run(serve(dictionary, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, List, Optional
+from headless import HeadlessGame, resolve_policy
+from layout import get_layout
+from movegen import MoveGenerator
+from profiling import PROFILER, ProfileStats
+from utils import load_compiled_dictionary
+
+# Per-process state, set up once by the pool initializer
+_worker = {}
+
+
+def init_worker(dict_file: str, policy_names: List[str], profile: bool = False, layout: str = 'standard'):
+    """Load the dictionary, policies and board layout once per worker process"""
+    if profile:
+        PROFILER.enable()
+    dictionary = load_compiled_dictionary(dict_file)
+    if not dictionary:
+        raise RuntimeError(f"Could not load dictionary '{dict_file}'")
+    _worker['dictionary'] = dictionary
+    _worker['generator'] = MoveGenerator.from_dictionary(dictionary)
+    _worker['policies'] = [resolve_policy(name) for name in policy_names]
+    _worker['layout'] = get_layout(layout)
+
+
+def worker_state() -> Dict:
+    """What init_worker loaded in this process: 'dictionary', 'generator', 'policies' and 'layout'"""
+    if not _worker:
+        raise RuntimeError("init_worker has not run in this process")
+    return _worker
+
+
+def play_game(game_id: int, seed: int) -> Dict:
+    """Play one complete game and summarize it as a JSON-serializable dict"""
+    start = time.perf_counter()
+    PROFILER.start_game()
+    game = HeadlessGame(_worker['generator'], _worker['policies'], _worker['dictionary'], seed,
+                        layout=_worker['layout']).play()
+    result = {
+        'game': game_id,
+        'seed': seed,
+        'scores': game.scores,
+        'plays': game.plays,
+        'bingos': game.bingos,
+        'turns': game.turns,
+        'game_over': game.game_over,
+        'seconds': round(time.perf_counter() - start, 4),
+    }
+    if PROFILER.enabled:
+        result['profile'] = PROFILER.game.to_dict()
+    return result
+
+
+def _play_game_args(args):
+    return play_game(*args)
+
+
+def run(dict_file: str, games: int, policies: List[str], seed: int = 0,
+        workers: Optional[int] = None, out=sys.stdout, profile: Optional[str] = None,
+        layout: str = 'standard') -> Dict:
+    """Play games across a process pool, streaming one JSON line per game
+
+    Game i is seeded with seed + i, so any single game can be replayed
+    regardless of how many workers ran it. With a profile path, each line
+    also carries that game's hot-path timings, and the totals over all
+    workers are written to the path (see Profiler.export).
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [(i, seed + i) for i in range(games)]
+    totals = {'games': 0, 'turns': 0, 'plays': 0, 'bingos': 0, 'game_over': 0,
+              'scores': [0] * len(policies)}
+    start = time.perf_counter()
+
+    PROFILER.reset()
+    with Pool(workers, initializer=init_worker, initargs=(dict_file, policies, profile is not None, layout)) as pool:
+        chunksize = max(1, games // (workers * 8))
+        for result in pool.imap_unordered(_play_game_args, tasks, chunksize=chunksize):
+            out.write(json.dumps(result) + "\n")
+            if 'profile' in result:
+                PROFILER.process.merge(ProfileStats.from_dict(result['profile']))
+            totals['games'] += 1
+            totals['turns'] += result['turns']
+            totals['plays'] += sum(result['plays'])
+            totals['bingos'] += sum(result['bingos'])
+            totals['game_over'] += result['game_over']
+            for player, score in enumerate(result['scores']):
+                totals['scores'][player] += score
+    out.flush()
+    if profile is not None:
+        PROFILER.export(profile)
+
+    elapsed = time.perf_counter() - start
+    count = max(totals['games'], 1)
+    return {
+        'games': totals['games'],
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'games_per_second': round(totals['games'] / elapsed, 2) if elapsed else 0.0,
+        'mean_scores': [round(score / count, 2) for score in totals['scores']],
+        'mean_turns': round(totals['turns'] / count, 2),
+        'bingo_rate': round(totals['bingos'] / max(totals['plays'], 1), 4),
+        'game_over_rate': round(totals['game_over'] / count, 4),
+    }
+
+
+def main():
+    """Entry point for headless self-play"""
+    parser = argparse.ArgumentParser(description="Play Scrabble games without a display")
+    parser.add_argument('dict_file', help="Dictionary file, one word per line")
+    parser.add_argument('--games', type=int, default=1000, help="Number of games to play")
+    parser.add_argument('--policy', action='append', dest='policies',
+                        help="Move policy per player (built-in name or module:function), repeat per player")
+    parser.add_argument('--seed', type=int, default=0, help="Base seed; game i uses seed + i")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--out', default='-', help="JSONL output file, '-' for stdout")
+    parser.add_argument('--profile', default=None,
+                        help="Write hot-path timings to this file (Prometheus text for .prom/.txt, else JSON)")
+    parser.add_argument('--layout', default='standard',
+                        help="Board layout: a built-in name (standard, super) or a JSON layout file")
+    args = parser.parse_args()
+
+    policies = args.policies or ['greedy', 'greedy']
+    try:
+        get_layout(args.layout)
+    except (ValueError, KeyError, OSError) as e:
+        parser.error(f"bad board layout: {e}")
+    out = sys.stdout if args.out == '-' else open(args.out, 'w', encoding='utf-8')
+    try:
+        summary = run(args.dict_file, args.games, policies, args.seed, args.workers, out, args.profile,
+                      args.layout)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
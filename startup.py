@@ -0,0 +1,58 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+STARTUP_BUDGET = 1.0  # Seconds from launch until the window is usable
+
+
+class StartupTrace:
+    """Wall-clock timings of the startup phases, measured from when the trace was created
+
+    Phases may be timed from any thread, so the dictionary load on the
+    worker shows up next to imports and UI construction on the GUI thread.
+    """
+
+    def __init__(self, budget: float = STARTUP_BUDGET):
+        self.budget = budget
+        self.start = time.perf_counter()
+        self.phases: List[Tuple[str, float, float]] = []  # name, started, seconds (relative to start)
+        self.marks: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = self.elapsed()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, started, self.elapsed() - started))
+
+    def mark(self, name: str):
+        """Record a point in time, such as the window first being shown"""
+        with self._lock:
+            self.marks.append((name, self.elapsed()))
+
+    def mark_time(self, name: str) -> Optional[float]:
+        for mark, seconds in self.marks:
+            if mark == name:
+                return seconds
+        return None
+
+    def over_budget(self, mark: str) -> bool:
+        seconds = self.mark_time(mark)
+        return seconds is not None and seconds > self.budget
+
+    def report(self) -> str:
+        with self._lock:
+            events = [(started, f"{name:<20} {started * 1000:8.1f} ms  +{seconds * 1000:.1f} ms")
+                      for name, started, seconds in self.phases]
+            events += [(seconds, f"{name:<20} {seconds * 1000:8.1f} ms")
+                       for name, seconds in self.marks]
+        lines = ["Startup trace:"] + [line for _, line in sorted(events)]
+        lines.append(f"{'budget':<20} {self.budget * 1000:8.1f} ms")
+        return '\n'.join(lines)
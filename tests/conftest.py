@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from movegen import MoveGenerator  # noqa: E402
+from utils import load_compiled_dictionary, load_dictionary  # noqa: E402
+
+DICT_FILE = os.path.join(ROOT, 'dic.txt')
+
+
+@pytest.fixture(scope='session')
+def words():
+    """The word list as a Trie, the plain reference for the compiled forms"""
+    return load_dictionary(DICT_FILE)
+
+
+@pytest.fixture(scope='session')
+def dictionary():
+    return load_compiled_dictionary(DICT_FILE)
+
+
+@pytest.fixture(scope='session')
+def generator(dictionary):
+    return MoveGenerator.from_dictionary(dictionary)
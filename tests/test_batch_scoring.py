@@ -0,0 +1,20 @@
+import pytest
+
+from headless import HeadlessGame, greedy_policy, random_policy
+from layout import STANDARD, SUPER
+
+pytest.importorskip('numpy')
+from batch_scoring import BatchScorer  # noqa: E402
+
+
+@pytest.mark.parametrize('layout', [STANDARD, SUPER], ids=lambda layout: layout.name)
+def test_batch_scores_match_exact_scoring(generator, dictionary, layout):
+    for seed in range(2):
+        game = HeadlessGame(generator, [greedy_policy, random_policy], dictionary, seed, layout=layout)
+        while not game.finished:
+            moves = generator.generate(game.state, game.racks[game.to_move])
+            if moves:
+                scores = BatchScorer(game.state).score_moves(moves)
+                assert list(scores) == [move.score for move in moves]
+                assert list(scores) == [game.state.validate_move(move.tiles()) for move in moves]
+            game.play_turn()
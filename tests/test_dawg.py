@@ -0,0 +1,69 @@
+import random
+import re
+
+import pytest
+
+from dawg import Dawg, compile_dictionary
+from lexicon import Trie
+from tests.conftest import DICT_FILE
+
+
+@pytest.fixture(scope='module')
+def word_set(words):
+    return set(words)
+
+
+@pytest.fixture(scope='module', params=['built', 'compiled'])
+def dawg(request, word_set, tmp_path_factory):
+    if request.param == 'built':
+        return Dawg.from_words(word_set, gaddag=True)
+    path = str(tmp_path_factory.mktemp('dawg') / 'dic.dawg')
+    compile_dictionary(DICT_FILE, path, gaddag=True)
+    return Dawg.open(path)
+
+
+def near_misses(word_set, count=2000):
+    rng = random.Random(0)
+    letters = sorted({ch for word in word_set for ch in word})
+    samples = sorted(word_set)
+    for _ in range(count):
+        word = rng.choice(samples)
+        i = rng.randrange(len(word) + 1)
+        yield word[:i] + rng.choice(letters) + word[i + 1:]
+        yield word[:i] + rng.choice(letters) + word[i:]
+
+
+def test_membership(dawg, word_set):
+    assert len(dawg) == len(word_set)
+    assert set(dawg) == word_set
+    for word in word_set:
+        assert word in dawg and word.lower() in dawg
+    for word in near_misses(word_set):
+        assert (word in dawg) == (word in word_set), word
+    assert '' not in dawg
+
+
+def test_prefixes(dawg, word_set):
+    prefixes = {word[:i] for word in word_set for i in range(len(word) + 1)}
+    for prefix in prefixes:
+        assert dawg.has_prefix(prefix)
+    for word in near_misses(word_set):
+        for i in range(1, len(word) + 1):
+            assert dawg.has_prefix(word[:i]) == (word[:i] in prefixes), word[:i]
+
+
+@pytest.mark.parametrize('pattern', ['?', '??', 'C?S?', '?A?', 'A??', '???E', '?????', 'ZZ?'])
+def test_match(dawg, word_set, pattern):
+    regex = re.compile(pattern.replace('?', '.'))
+    expected = sorted(word for word in word_set if regex.fullmatch(word))
+    assert sorted(dawg.match(pattern)) == expected
+    assert sorted(Trie(word_set).match(pattern)) == expected
+
+
+def test_cedilla_and_comma_forms_fold():
+    words = ['ŞARPE', 'ţara', 'PEȘTE', 'ȚARĂ']
+    for lexicon in (Dawg.from_words(words), Trie(words)):
+        for query in ('ȘARPE', 'şarpe', 'ŢARA', 'țara', 'PEŞTE', 'pește'):
+            assert query in lexicon, (type(lexicon).__name__, query)
+        assert 'TARA' not in lexicon
+        assert 'ȚARĂ' not in lexicon  # No Ă tile, so the word cannot be played
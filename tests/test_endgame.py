@@ -0,0 +1,40 @@
+import pytest
+
+from endgame import EndgameSolver, rack_value
+from headless import HeadlessGame, greedy_policy
+from tile import tile_letter
+
+
+def brute_force(generator, state, me, opponent, passed=False):
+    """Exhaustive negamax over every move and pass, no pruning or tables"""
+    best = None
+    for move in generator.generate(state, me):
+        rest = list(me)
+        for letter in move.tiles().values():
+            rest.remove(tile_letter(letter))
+        if not rest:
+            value = move.score + rack_value(opponent)
+        else:
+            state.commit_move(move.tiles())
+            value = move.score - brute_force(generator, state, opponent, rest)
+            state.retract_move(move.tiles())
+        best = value if best is None else max(best, value)
+    if passed:
+        value = rack_value(opponent) - rack_value(me)
+    else:
+        value = -brute_force(generator, state, opponent, me, True)
+    return value if best is None else max(best, value)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 4, 8, 9])
+def test_solver_matches_brute_force(generator, dictionary, seed):
+    game = HeadlessGame(generator, [greedy_policy] * 2, dictionary, seed)
+    while game.tile_system.remaining_tiles() > 70:
+        game.play_turn()
+    me, opponent = game.racks[game.to_move][:3], game.racks[1 - game.to_move][:3]
+    cells, zobrist = bytes(game.state.cells), game.state.zobrist
+
+    result = EndgameSolver(generator, deadline=30).solve(game.state, (me, opponent))
+    assert (bytes(game.state.cells), game.state.zobrist) == (cells, zobrist)
+    assert result.complete
+    assert result.value == brute_force(generator, game.state, me, opponent)
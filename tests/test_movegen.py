@@ -0,0 +1,86 @@
+import itertools
+import random
+from collections import Counter
+
+from board_state import BoardState, BOARD_SIZE, TILE_CODES
+from headless import HeadlessGame, greedy_policy, random_policy
+from tile import TileSystem, tile_letter
+
+
+def positions(generator, dictionary, seeds):
+    """(state, rack) at every turn of a few self-play games"""
+    for seed in seeds:
+        game = HeadlessGame(generator, [greedy_policy, random_policy], dictionary, seed)
+        while not game.finished:
+            yield game.state, game.racks[game.to_move]
+            game.play_turn()
+
+
+def brute_force_moves(state, rack, words):
+    """Every legal (placements, score) found by trying each word at each square"""
+    found = set()
+    held = Counter(rack)
+    blanks = held['*']
+    for word in words:
+        word = word.upper()
+        if len(word) > BOARD_SIZE or any(ch not in TILE_CODES for ch in word):
+            continue
+        for horizontal, row, col in itertools.product((True, False), range(BOARD_SIZE), range(BOARD_SIZE)):
+            placements = {}
+            for i, ch in enumerate(word):
+                r, c = (row, col + i) if horizontal else (row + i, col)
+                if r >= BOARD_SIZE or c >= BOARD_SIZE:
+                    break
+                existing = state.get_letter(r, c)
+                if existing:
+                    if existing.upper() != ch:
+                        break
+                else:
+                    placements[(r, c)] = ch
+            else:
+                if not placements or sum((Counter(placements.values()) - held).values()) > blanks:
+                    continue
+                for k in range(blanks + 1):
+                    for squares in itertools.combinations(placements, k):
+                        tiles = dict(placements)
+                        for square in squares:
+                            tiles[square] = tiles[square].lower()
+                        if Counter(tile_letter(t) for t in tiles.values()) - held:
+                            continue
+                        score = state.validate_move(tiles)
+                        if score is not None:
+                            found.add((frozenset(tiles.items()), score))
+    return found
+
+
+def test_moves_score_as_validated(generator, dictionary):
+    checked = 0
+    for state, rack in positions(generator, dictionary, range(3)):
+        moves = generator.generate(state, rack)
+        keys = [frozenset(move.placements) for move in moves]
+        assert len(keys) == len(set(keys))
+        for move in moves:
+            assert state.validate_move(move.tiles()) == move.score, move
+        checked += len(moves)
+    assert checked > 1000
+
+
+def test_moves_match_brute_force(generator, dictionary, words):
+    rng = random.Random(1)
+    state = BoardState(dictionary)
+    generator.attach(state)
+    bag = TileSystem(seed=4)
+    rack = bag.draw_letters(7)
+    for turn in range(12):
+        rack[0] = '*'
+        moves = generator.generate(state, rack)
+        if turn in (0, 7):
+            expected = brute_force_moves(state, rack, words)
+            assert {(frozenset(m.tiles().items()), m.score) for m in moves} == expected
+        if not moves:
+            break
+        move = rng.choice(sorted(moves, key=lambda m: -m.score)[:5])
+        state.commit_move(move.tiles())
+        for letter in move.tiles().values():
+            rack.remove(tile_letter(letter))
+        rack += bag.draw_letters(7 - len(rack))
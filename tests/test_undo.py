@@ -0,0 +1,56 @@
+import pytest
+
+from headless import HeadlessGame, greedy_policy
+from tile import TileSystem
+
+
+def sometimes_exchange(game, moves, rack):
+    return None if game.turns % 4 == 1 else greedy_policy(game, moves, rack)
+
+
+def snapshot(game):
+    """Everything undo must restore; an unordered bag's random source moves on regardless"""
+    bag = game.tile_system
+    rng_state = bag.rng.getstate() if bag.order is not None else None
+    return (tuple(bag.order or ()), tuple(bag.counts), rng_state, game.state.snapshot(),
+            game.state.zobrist, tuple(game.scores), tuple(tuple(sorted(rack)) for rack in game.racks))
+
+
+@pytest.mark.parametrize('seed, bag_seed', [(1, 5), (1, 6), (1, 7), (3, None)])
+def test_undo_redo_round_trip(generator, dictionary, seed, bag_seed):
+    game = HeadlessGame(generator, [sometimes_exchange] * 2, dictionary, seed, bag_seed=bag_seed)
+    history = [snapshot(game)]
+    while not game.finished:
+        game.play_turn()
+        history.append(snapshot(game))
+    assert any(move.kind == 'exchange' for move in game.log.moves)
+
+    for before in reversed(history[:-1]):
+        assert game.undo()
+        assert snapshot(game) == before
+    assert not game.undo()
+    for after in history[1:]:
+        assert game.redo()
+        assert snapshot(game) == after
+    assert not game.redo()
+
+
+def test_replay_after_undo_with_ordered_bag(generator, dictionary):
+    """With a fixed bag, undoing and playing on deals exactly the same game"""
+    game = HeadlessGame(generator, [sometimes_exchange] * 2, dictionary, 1, bag_seed=7)
+    game.play()
+    final = snapshot(game)
+    for _ in range(len(game.log.moves) // 2):
+        game.undo()
+    del game.log.moves[game.log.cursor:]
+    game.play()
+    assert snapshot(game) == final
+
+
+@pytest.mark.parametrize('ordered', [False, True])
+def test_failed_take_leaves_bag_untouched(ordered):
+    bag = TileSystem(seed=3, ordered=ordered)
+    before = (list(bag.order or ()), list(bag.counts), bag.total, bag.rng.getstate())
+    with pytest.raises(ValueError):
+        bag.take_letters(['A'] * 20)
+    assert (list(bag.order or ()), list(bag.counts), bag.total, bag.rng.getstate()) == before
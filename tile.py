@@ -1,77 +1,205 @@
-from dataclasses import dataclass
-from typing import Dict, List
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 import random
+from language import LANGUAGE
 
-@dataclass
-class ScrabbleTile:
-    """Represents a single Scrabble tile"""
+BLANK = '*'
+
+
+def tile_letter(letter: str) -> str:
+    """Map a letter as played on the board back to the tile it came from
+
+    Blanks are played as lowercase letters, so those map to the blank tile.
+    """
+    return BLANK if letter.islower() else letter
+
+
+class ScrabbleTile(NamedTuple):
+    """Represents a single Scrabble tile; immutable, so TILES holds one shared tile per letter"""
     letter: str
     value: int
     is_blank: bool = False
 
+
+class BagSnapshot(NamedTuple):
+    """Bag contents captured by TileSystem.snapshot()"""
+    counts: Tuple[int, ...]  # Tiles per letter, in LETTERS order
+    order: Optional[Tuple[str, ...]] = None  # Draw order, bottom to top, when the bag is ordered
+
+
 class TileSystem:
     """Manages the tile distribution and bag for the game"""
     
-    # Standard Romanian Scrabble tile distribution
-    TILE_DISTRIBUTION = {
-        'A': {'count': 11, 'value': 1},
-        'B': {'count': 2, 'value': 9},
-        'C': {'count': 5, 'value': 1},
-        'D': {'count': 4, 'value': 2},
-        'E': {'count': 9, 'value': 1},
-        'F': {'count': 2, 'value': 8},
-        'G': {'count': 2, 'value': 9},
-        'H': {'count': 1, 'value': 10},
-        'I': {'count': 10, 'value': 1},
-        'Î': {'count': 1, 'value': 8},
-        'J': {'count': 1, 'value': 10},
-        'L': {'count': 4, 'value': 1},
-        'M': {'count': 3, 'value': 4},
-        'N': {'count': 6, 'value': 1},
-        'O': {'count': 5, 'value': 1},
-        'P': {'count': 4, 'value': 2},
-        'R': {'count': 7, 'value': 1},
-        'S': {'count': 5, 'value': 1},
-        'Ș': {'count': 1, 'value': 8},
-        'T': {'count': 7, 'value': 1},
-        'Ț': {'count': 1, 'value': 8},
-        'U': {'count': 6, 'value': 1},
-        'V': {'count': 2, 'value': 8},
-        'X': {'count': 1, 'value': 10},
-        'Z': {'count': 1, 'value': 10},
-        '*': {'count': 2, 'value': 0}  # Blank tiles
-    }
-
-    def __init__(self):
-        """Initialize the tile system with an empty bag"""
-        self.bag: List[ScrabbleTile] = []
+    # Tile counts and values of the language pack
+    TILE_DISTRIBUTION = LANGUAGE.tiles
+
+    LETTERS = list(TILE_DISTRIBUTION)
+    LETTER_INDEX = {letter: i for i, letter in enumerate(LETTERS)}
+    INITIAL_COUNTS = [info['count'] for info in TILE_DISTRIBUTION.values()]
+
+    def __init__(self, rng: Optional[random.Random] = None, seed: Optional[int] = None,
+                 ordered: bool = False):
+        """Initialize the tile system with a full bag
+
+        Args:
+            rng: Random source for draws, shared with the caller if given
+            seed: Seed for a private random source when no rng is given
+            ordered: Shuffle the bag once and draw from the top, so the n-th
+                tile drawn is the same however the draws were split up. Games
+                with the same seed then deal identical tiles to each seat.
+        """
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.counts: List[int] = []  # Tiles left in the bag per letter, in LETTERS order
+        self.total = 0
+        self.order: Optional[List[str]] = [] if ordered else None  # Bag from bottom to top when ordered
+        # Ordered bags: letters, insertion depths and prior random state of each return, for take_back_letters
+        self.returns: List[Tuple[str, List[int], object]] = []
         self.initialize_bag()
 
     def initialize_bag(self):
         """Fill the bag with the initial distribution of tiles"""
-        self.bag.clear()
-        for letter, info in self.TILE_DISTRIBUTION.items():
-            for _ in range(info['count']):
-                is_blank = letter == '*'
-                self.bag.append(ScrabbleTile(letter, info['value'], is_blank))
-        random.shuffle(self.bag)
+        self.counts = list(self.INITIAL_COUNTS)
+        self.total = sum(self.counts)
+        if self.order is not None:
+            self._shuffle_order()
+
+    def _shuffle_order(self):
+        self.order = [letter for letter, count in zip(self.LETTERS, self.counts) for _ in range(count)]
+        self.rng.shuffle(self.order)
+        self.returns = []
+
+    def draw_letters(self, count: int) -> List[str]:
+        """Draw letters at random without creating tile objects"""
+        if self.order is not None:
+            return self._draw_ordered(count)
+        counts = self.counts
+        letters = self.LETTERS
+        randrange = self.rng.randrange
+        drawn = []
+        for _ in range(min(count, self.total)):
+            # Pick a tile uniformly by walking the per-letter counts
+            r = randrange(self.total)
+            i = 0
+            while r >= counts[i]:
+                r -= counts[i]
+                i += 1
+            counts[i] -= 1
+            self.total -= 1
+            drawn.append(letters[i])
+        return drawn
+
+    def _draw_ordered(self, count: int) -> List[str]:
+        index = self.LETTER_INDEX
+        drawn = []
+        for _ in range(min(count, self.total)):
+            letter = self.order.pop()
+            self.counts[index[letter]] -= 1
+            self.total -= 1
+            drawn.append(letter)
+        return drawn
 
     def draw_tiles(self, count: int) -> List[ScrabbleTile]:
         """Draw a specified number of tiles from the bag"""
-        if count > len(self.bag):
-            count = len(self.bag)
-        drawn_tiles = self.bag[:count]
-        self.bag = self.bag[count:]
-        return drawn_tiles
+        return [self.make_tile(letter) for letter in self.draw_letters(count)]
+
+    def return_letters(self, letters: List[str]):
+        """Put letters back in the bag"""
+        index = self.LETTER_INDEX
+        for letter in letters:
+            self.counts[index[letter]] += 1
+        self.total += len(letters)
+        if self.order is not None:
+            # Returned tiles are mixed back in at random depths
+            state = self.rng.getstate()
+            depths = []
+            for letter in letters:
+                depth = self.rng.randrange(len(self.order) + 1)
+                self.order.insert(depth, letter)
+                depths.append(depth)
+            self.returns.append((''.join(letters), depths, state))
+
+    def undraw_letters(self, letters: List[str]):
+        """Put just-drawn letters back on top of the bag, exactly undoing draw_letters"""
+        index = self.LETTER_INDEX
+        for letter in letters:
+            self.counts[index[letter]] += 1
+        self.total += len(letters)
+        if self.order is not None:
+            # The first letter drawn was on top, so it goes back last
+            self.order.extend(reversed(letters))
+
+    def take_back_letters(self, letters: List[str]):
+        """Undo the latest return_letters of these letters, e.g. when an exchange is taken back
+
+        An ordered bag removes them from the depths they went in at and
+        rewinds its random source, so the bag and any later returns repeat
+        exactly. Otherwise this is take_letters.
+        """
+        if self.order is None or not self.returns or self.returns[-1][0] != ''.join(letters):
+            self.take_letters(letters)
+            return
+        _, depths, state = self.returns.pop()
+        for depth in reversed(depths):
+            del self.order[depth]
+        index = self.LETTER_INDEX
+        for letter in letters:
+            self.counts[index[letter]] -= 1
+        self.total -= len(letters)
+        self.rng.setstate(state)
+
+    def take_letters(self, letters: List[str]):
+        """Remove specific letters from the bag, e.g. to replay a recorded draw
+
+        Nothing changes if any letter is missing. An ordered bag gives up the
+        topmost copy of each letter, so replaying the draw undraw_letters put
+        back takes the same tiles.
+        """
+        index = self.LETTER_INDEX
+        needed = Counter(letters)
+        for letter, count in needed.items():
+            if self.counts[index[letter]] < count:
+                raise ValueError(f"No '{letter}' left in the bag")
+        for letter in letters:
+            self.counts[index[letter]] -= 1
+            if self.order is not None:
+                order = self.order
+                del order[len(order) - 1 - order[::-1].index(letter)]
+        self.total -= len(letters)
 
     def return_tiles(self, tiles: List[ScrabbleTile]):
-        """Return tiles to the bag and shuffle"""
-        self.bag.extend(tiles)
-        random.shuffle(self.bag)
+        """Return tiles to the bag"""
+        self.return_letters([tile.letter for tile in tiles])
+
+    def snapshot(self) -> BagSnapshot:
+        """Capture the bag contents, and their order in an ordered bag, for a later restore"""
+        return BagSnapshot(tuple(self.counts), tuple(self.order) if self.order is not None else None)
+
+    def restore(self, snapshot: BagSnapshot):
+        """Put the bag back to a captured state
+
+        An ordered bag takes the captured order exactly; given counts alone,
+        it shuffles them into a new order.
+        """
+        self.counts = list(snapshot.counts)
+        self.total = sum(snapshot.counts)
+        if self.order is not None:
+            if snapshot.order is not None:
+                self.order = list(snapshot.order)
+                self.returns = []
+            else:
+                self._shuffle_order()
+
+    def letter_counts(self) -> Dict[str, int]:
+        """Get the number of tiles left in the bag per letter"""
+        return {letter: count for letter, count in zip(self.LETTERS, self.counts) if count}
+
+    def make_tile(self, letter: str) -> ScrabbleTile:
+        """Get the tile for a letter, e.g. when a letter rack goes back into the bag"""
+        return TILES[letter]
 
     def remaining_tiles(self) -> int:
         """Get the number of tiles remaining in the bag"""
-        return len(self.bag)
+        return self.total
 
     def get_letter_value(self, letter: str) -> int:
         """Get the point value for a given letter"""
@@ -82,14 +210,120 @@ class TileSystem:
     def validate_tiles(self, tiles: List[ScrabbleTile]) -> bool:
         """Validate that a set of tiles could legally come from this distribution"""
         # Count tiles by letter
-        counts = {}
+        counts = [0] * len(self.LETTERS)
+        index = self.LETTER_INDEX
         for tile in tiles:
-            counts[tile.letter] = counts.get(tile.letter, 0) + 1
+            i = index.get(tile.letter)
+            if i is None:
+                return False
+            counts[i] += 1
             
         # Check against distribution
-        for letter, count in counts.items():
-            if letter not in self.TILE_DISTRIBUTION:
-                return False
-            if count > self.TILE_DISTRIBUTION[letter]['count']:
-                return False
-        return True
\ No newline at end of file
+        return all(count <= limit for count, limit in zip(counts, self.INITIAL_COUNTS))
+
+
+# One shared tile per letter; tiles are immutable, so none are created during play
+TILES = {letter: ScrabbleTile(letter, info['value'], letter == BLANK)
+         for letter, info in TileSystem.TILE_DISTRIBUTION.items()}
+LETTER_VALUES = [info['value'] for info in TileSystem.TILE_DISTRIBUTION.values()]
+
+
+class Rack:
+    """Rack letters as a count per letter, in TileSystem.LETTERS order
+
+    Adding or removing a tile updates one count without creating objects,
+    and MoveGenerator reads the counts directly. Letters iterate in
+    alphabet order, so equal racks list the same letters.
+    """
+
+    __slots__ = ('counts', 'size')
+
+    def __init__(self, letters: Iterable[str] = ()):
+        self.counts = [0] * len(TileSystem.LETTERS)
+        self.size = 0
+        for letter in letters:
+            self.add(letter)
+
+    @classmethod
+    def from_counts(cls, counts: Iterable[int]) -> 'Rack':
+        rack = cls()
+        rack.counts = list(counts)
+        rack.size = sum(rack.counts)
+        return rack
+
+    def add(self, letter: str):
+        self.counts[TileSystem.LETTER_INDEX[letter]] += 1
+        self.size += 1
+
+    def remove(self, letter: str):
+        """Take a tile off the rack, raising ValueError if it is not there"""
+        code = TileSystem.LETTER_INDEX.get(letter)
+        if code is None or not self.counts[code]:
+            raise ValueError(f"No '{letter}' on the rack")
+        self.counts[code] -= 1
+        self.size -= 1
+
+    def count(self, letter: str) -> int:
+        return self.counts[TileSystem.LETTER_INDEX[letter]]
+
+    def copy(self) -> 'Rack':
+        return Rack.from_counts(self.counts)
+
+    def letters(self) -> List[str]:
+        return list(self)
+
+    def value(self) -> int:
+        """Total points of the tiles on the rack"""
+        return sum(count * value for count, value in zip(self.counts, LETTER_VALUES))
+
+    def key(self) -> Tuple[int, ...]:
+        """Hashable form of the rack's contents"""
+        return tuple(self.counts)
+
+    def leaves(self) -> Iterator['Rack']:
+        """Every distinct set of tiles that can be kept, from the empty leave to the full rack
+
+        Repeated letters are not told apart, so a rack of 7 different
+        letters has 128 leaves and one with duplicates fewer.
+        """
+        present = [code for code, count in enumerate(self.counts) if count]
+        kept = [0] * len(self.counts)
+
+        def extend(i: int) -> Iterator[Rack]:
+            if i == len(present):
+                yield Rack.from_counts(kept)
+                return
+            code = present[i]
+            for count in range(self.counts[code] + 1):
+                kept[code] = count
+                yield from extend(i + 1)
+            kept[code] = 0
+
+        return extend(0)
+
+    def __sub__(self, other: 'Rack') -> 'Rack':
+        """Tiles of this rack not in the other, e.g. the tiles exchanged for a leave"""
+        counts = [count - kept for count, kept in zip(self.counts, other.counts)]
+        if min(counts) < 0:
+            raise ValueError(f"{other!r} is not part of {self!r}")
+        return Rack.from_counts(counts)
+
+    def __iter__(self) -> Iterator[str]:
+        for letter, count in zip(TileSystem.LETTERS, self.counts):
+            for _ in range(count):
+                yield letter
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, letter: str) -> bool:
+        code = TileSystem.LETTER_INDEX.get(letter)
+        return code is not None and self.counts[code] > 0
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Rack) and self.counts == other.counts
+
+    __hash__ = None  # Mutable; use key() for dictionaries
+
+    def __repr__(self) -> str:
+        return f"Rack({''.join(self)!r})"
@@ -0,0 +1,256 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from headless import HeadlessGame
+from simulate import init_worker, worker_state
+
+ELO_SCALE = 400 / math.log(10)  # Elo points per unit of log-odds
+PRIOR_DRAWS = 1.0  # Virtual drawn games per pairing, so unbeaten policies get a finite rating
+Z_95 = 1.96
+
+# A game is identified by the policies in seat order and its seed
+GameKey = Tuple[str, str, int]
+
+
+def schedule(policies: List[str], pairs: int, seed: int = 0) -> List[GameKey]:
+    """Round robin over every pair of policies, each seed played once from each seat
+
+    All pairings use the same seed list, and both games of a pair share the
+    seed, so the policies face identical deals with the seats swapped.
+    """
+    games = []
+    for first, second in itertools.combinations(policies, 2):
+        for game_seed in range(seed, seed + pairs):
+            games.append((first, second, game_seed))
+            games.append((second, first, game_seed))
+    return games
+
+
+def play_match(key: GameKey) -> Dict:
+    """Play one game between two policies (see simulate.init_worker) and summarize it"""
+    first, second, seed = key
+    start = time.perf_counter()
+    worker = worker_state()
+    policies = [worker['policies'][worker['names'].index(name)] for name in (first, second)]
+    game = HeadlessGame(worker['generator'], policies, worker['dictionary'], seed, bag_seed=seed).play()
+    return {
+        'players': [first, second],
+        'seed': seed,
+        'scores': game.scores,
+        'turns': game.turns,
+        'seconds': round(time.perf_counter() - start, 4),
+    }
+
+
+def _init_tournament_worker(dict_file: str, policy_names: List[str]):
+    init_worker(dict_file, policy_names)
+    worker_state()['names'] = policy_names
+
+
+def read_results(path: str, repair: bool = False) -> List[Dict]:
+    """Results already in a results file
+
+    Reading stops at a partly written line, as left by an interrupted run;
+    with repair, the file is cut back to the complete lines before it.
+    """
+    results = []
+    if not os.path.exists(path):
+        return results
+    complete = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+            complete += len(line)
+    if repair and complete < os.path.getsize(path):
+        os.truncate(path, complete)
+    return results
+
+
+def result_key(result: Dict) -> GameKey:
+    first, second = result['players']
+    return first, second, result['seed']
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    """Gaussian elimination with partial pivoting for a small dense system"""
+    n = len(vector)
+    rows = [row[:] + [value] for row, value in zip(matrix, vector)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(col + 1, n):
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, n + 1):
+                rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        solution[r] = (rows[r][n] - sum(rows[r][c] * solution[c] for c in range(r + 1, n))) / rows[r][r]
+    return solution
+
+
+def fit_ratings(results: Iterable[Dict], policies: List[str]) -> Dict[str, Tuple[float, float]]:
+    """Maximum likelihood Elo ratings with 95% confidence half-widths
+
+    A Bradley-Terry model fitted by Newton's method, counting a tied game
+    as half a win each. Ratings are relative to the first policy, which is
+    fixed at 0; intervals come from the inverse of the Fisher information.
+    """
+    n = len(policies)
+    index = {name: i for i, name in enumerate(policies)}
+    wins = [[0.0] * n for _ in range(n)]
+    for result in results:
+        first, second = (index[name] for name in result['players'])
+        score_first, score_second = result['scores']
+        outcome = 1.0 if score_first > score_second else 0.5 if score_first == score_second else 0.0
+        wins[first][second] += outcome
+        wins[second][first] += 1.0 - outcome
+    for i in range(n):
+        for j in range(n):
+            if i != j and (wins[i][j] or wins[j][i]):
+                wins[i][j] += PRIOR_DRAWS / 2
+    games = [[wins[i][j] + wins[j][i] for j in range(n)] for i in range(n)]
+
+    strength = [0.0] * n
+    information = [[0.0] * (n - 1) for _ in range(n - 1)]
+    for _ in range(100):
+        gradient = [0.0] * n
+        hessian = [[0.0] * n for _ in range(n)]
+        for i in range(n):
+            for j in range(n):
+                if i == j or not games[i][j]:
+                    continue
+                p = 1 / (1 + math.exp(strength[j] - strength[i]))
+                gradient[i] += wins[i][j] - games[i][j] * p
+                weight = games[i][j] * p * (1 - p)
+                hessian[i][i] += weight
+                hessian[i][j] -= weight
+        # Policy 0 is the anchor, so solve for the others
+        information = [row[1:] for row in hessian[1:]]
+        if n == 1 or not any(information[i][i] for i in range(n - 1)):
+            break
+        step = _solve(information, gradient[1:])
+        for i, delta in enumerate(step, start=1):
+            strength[i] += delta
+        if max(abs(delta) for delta in step) < 1e-9:
+            break
+
+    ratings = {policies[0]: (0.0, 0.0)}
+    for i in range(1, n):
+        unit = [1.0 if k == i - 1 else 0.0 for k in range(n - 1)]
+        variance = _solve(information, unit)[i - 1] if information[i - 1][i - 1] else float('inf')
+        ratings[policies[i]] = (strength[i] * ELO_SCALE, Z_95 * math.sqrt(variance) * ELO_SCALE)
+    return ratings
+
+
+def pairing_stats(results: Iterable[Dict], policies: List[str]) -> List[Dict]:
+    """Per pairing: games, win rate and the mean spread of each paired deal with its 95% interval"""
+    spreads: Dict[Tuple[str, str], Dict[int, List[int]]] = {}
+    records: Dict[Tuple[str, str], List[float]] = {}
+    order = {name: i for i, name in enumerate(policies)}
+    for result in results:
+        first, second = result['players']
+        scores = result['scores']
+        a, b = sorted((first, second), key=order.get)
+        spread = scores[0] - scores[1] if first == a else scores[1] - scores[0]
+        spreads.setdefault((a, b), {}).setdefault(result['seed'], []).append(spread)
+        record = records.setdefault((a, b), [0, 0.0])
+        record[0] += 1
+        record[1] += 1.0 if spread > 0 else 0.5 if spread == 0 else 0.0
+
+    stats = []
+    for (a, b), by_seed in spreads.items():
+        # Average the two seatings of a deal first, cancelling most of the luck of the draw
+        paired = [sum(values) / len(values) for values in by_seed.values()]
+        mean = sum(paired) / len(paired)
+        variance = sum((x - mean) ** 2 for x in paired) / (len(paired) - 1) if len(paired) > 1 else float('inf')
+        games, won = records[(a, b)]
+        stats.append({'players': [a, b], 'games': games, 'win_rate': won / games,
+                      'spread': mean, 'spread_ci': Z_95 * math.sqrt(variance / len(paired))})
+    return sorted(stats, key=lambda s: (order[s['players'][0]], order[s['players'][1]]))
+
+
+def report(results: List[Dict], policies: List[str]) -> str:
+    ratings = fit_ratings(results, policies)
+    lines = [f"{'policy':<24}{'elo':>8}{'95% ci':>10}"]
+    for name, (elo, interval) in sorted(ratings.items(), key=lambda item: -item[1][0]):
+        lines.append(f"{name:<24}{elo:>8.1f}{'±' + format(interval, '.1f'):>10}")
+    lines.append("")
+    lines.append(f"{'pairing':<36}{'games':>7}{'win %':>8}{'spread':>9}{'95% ci':>10}")
+    for s in pairing_stats(results, policies):
+        pairing = f"{s['players'][0]} vs {s['players'][1]}"
+        lines.append(f"{pairing:<36}{s['games']:>7}{s['win_rate'] * 100:>8.1f}"
+                     f"{s['spread']:>9.1f}{'±' + format(s['spread_ci'], '.1f'):>10}")
+    return '\n'.join(lines)
+
+
+def run(dict_file: str, policies: List[str], pairs: int, results_file: str, seed: int = 0,
+        workers: Optional[int] = None) -> List[Dict]:
+    """Play every scheduled game not already in the results file, appending as games finish
+
+    Interrupting and rerunning with the same arguments picks up where the
+    file ends. Returns every result in this schedule, old and new; games
+    in the file from other seeds or pair counts are left out.
+    """
+    games = schedule(policies, pairs, seed)
+    scheduled = set(games)
+    previous = []
+    done: Set[GameKey] = set()
+    for result in read_results(results_file, repair=True):
+        key = result_key(result)
+        if key in scheduled and key not in done:
+            previous.append(result)
+            done.add(key)
+    pending = [key for key in games if key not in done]
+    results = list(previous)
+    if not pending:
+        return results
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    with open(results_file, 'a', encoding='utf-8') as out, \
+            Pool(workers, initializer=_init_tournament_worker, initargs=(dict_file, policies)) as pool:
+        chunksize = max(1, len(pending) // (workers * 8))
+        for count, result in enumerate(pool.imap_unordered(play_match, pending, chunksize=chunksize), start=1):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            results.append(result)
+            if count % 500 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{count}/{len(pending)} games, {count / elapsed:.1f} games/s", file=sys.stderr)
+    return results
+
+
+def main():
+    """Entry point for bot tournaments"""
+    parser = argparse.ArgumentParser(description="Round-robin tournament between move policies")
+    parser.add_argument('dict_file', help="Dictionary file, one word per line")
+    parser.add_argument('--policy', action='append', dest='policies', required=True,
+                        help="Move policy (built-in name or module:function), repeat for each entrant")
+    parser.add_argument('--pairs', type=int, default=1000,
+                        help="Deals per pairing; each is played once from each seat")
+    parser.add_argument('--seed', type=int, default=0, help="First seed of the shared seed list")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--results', default='tournament.jsonl',
+                        help="JSONL results file, appended to and resumed from")
+    args = parser.parse_args()
+
+    policies = list(dict.fromkeys(args.policies))
+    if len(policies) < 2:
+        parser.error("a tournament needs at least two different policies")
+    results = run(args.dict_file, policies, args.pairs, args.results, args.seed, args.workers)
+    print(report(results, policies))
+
+
+if __name__ == "__main__":
+    main()
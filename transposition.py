@@ -0,0 +1,86 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import random
+from board_state import BoardState
+from tile import TileSystem
+
+
+def _build_rack_keys() -> Dict[Tuple[str, int], int]:
+    """A random 64-bit key per (letter, copy number), so a rack hashes the same in any order"""
+    rng = random.Random(0x2AC4)
+    return {(letter, copy): rng.getrandbits(64)
+            for letter, count in zip(TileSystem.LETTERS, TileSystem.INITIAL_COUNTS) for copy in range(count)}
+
+
+RACK_KEYS = _build_rack_keys()
+
+
+def rack_hash(rack: Iterable[str]) -> int:
+    """Zobrist hash of a multiset of rack letters"""
+    key = 0
+    copies: Dict[str, int] = {}
+    for letter in rack:
+        copy = copies.get(letter, 0)
+        copies[letter] = copy + 1
+        key ^= RACK_KEYS[(letter, copy)]
+    return key
+
+
+def position_key(state: BoardState, rack: Iterable[str]) -> int:
+    """Hash of the board and the rack to move, combining the board's incremental key"""
+    return state.zobrist ^ rack_hash(rack)
+
+
+class TranspositionTable:
+    """Fixed-size table of search results keyed on 64-bit Zobrist hashes
+
+    Each key maps to one slot (key & mask). A store overwrites the slot when
+    it holds the same key, a result searched no deeper, or a result from an
+    earlier search generation (see new_search()); otherwise the deeper,
+    current entry is kept. Memory stays bounded however many positions are
+    visited.
+    """
+
+    def __init__(self, size_bits: int = 16):
+        size = 1 << size_bits
+        self.mask = size - 1
+        self.keys: List[Optional[int]] = [None] * size
+        self.depths = [0] * size
+        self.generations = [0] * size
+        self.values: List[Any] = [None] * size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def new_search(self):
+        """Mark existing entries as stale so the next search may replace them freely"""
+        self.generation += 1
+
+    def get(self, key: int, depth: int = 0) -> Any:
+        """The value stored for a key from a search at least this deep, None if there is none"""
+        slot = key & self.mask
+        if self.keys[slot] == key and self.depths[slot] >= depth:
+            self.hits += 1
+            return self.values[slot]
+        self.misses += 1
+        return None
+
+    def put(self, key: int, value: Any, depth: int = 0):
+        """Store a value, subject to the replacement policy"""
+        slot = key & self.mask
+        if (self.keys[slot] is None or self.keys[slot] == key or depth >= self.depths[slot] or
+                self.generations[slot] != self.generation):
+            self.keys[slot] = key
+            self.depths[slot] = depth
+            self.generations[slot] = self.generation
+            self.values[slot] = value
+
+    def clear(self):
+        size = self.mask + 1
+        self.keys = [None] * size
+        self.depths = [0] * size
+        self.generations = [0] * size
+        self.values = [None] * size
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(key is not None for key in self.keys)
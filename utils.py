@@ -2,19 +2,22 @@ import sys
 import os
 from typing import Set, Optional
 from tile import TileSystem
+from dawg import Dawg, compile_dictionary, source_digest, read_header
+from lexicon import Trie
 
-def load_dictionary(dict_file: str) -> Optional[Set[str]]:
+def load_dictionary(dict_file: str) -> Optional[Trie]:
     """
-    Load a dictionary file into a set of words.
+    Load a dictionary file into an in-memory trie.
     
     Args:
         dict_file: Path to the dictionary file
         
     Returns:
-        Set of words if successful, None if there was an error
+        Trie supporting membership and prefix lookups, None if there was an error
         
     The dictionary file should contain one word per line.
-    Words are converted to lowercase before being added to the set.
+    Words are encoded to the language pack's letter codes once, here, so
+    lookups compare codes. Words with letters that have no tiles are left out.
     Empty lines and whitespace are stripped.
     """
     try:
@@ -25,7 +28,7 @@ def load_dictionary(dict_file: str) -> Optional[Set[str]]:
             
         # Read and process file
         with open(dict_file, 'r', encoding='utf-8') as f:
-            words = {line.strip().lower() for line in f if line.strip()}
+            words = Trie(line.strip() for line in f if line.strip())
             
         # Validate dictionary
         if not words:
@@ -41,18 +44,82 @@ def load_dictionary(dict_file: str) -> Optional[Set[str]]:
         print(f"An error occurred while loading the dictionary: {str(e)}")
         return None
 
+def load_compiled_dictionary(dict_file: str, gaddag: bool = False,
+                             cache_file: Optional[str] = None, verify: bool = True) -> Optional[Dawg]:
+    """
+    Load a dictionary file as a memory-mapped DAWG, compiling it when needed.
+    
+    Args:
+        dict_file: Path to the dictionary file
+        gaddag: Also build a GADDAG (larger, for bidirectional move generation)
+        cache_file: Path of the compiled file, defaults to dict_file + '.dawg'
+        verify: Always hash the text file; when False a compiled file newer than
+            the text file is trusted without reading the word list
+        
+    Returns:
+        Dawg supporting membership and prefix lookups, None if there was an error
+        
+    The compiled file stores the SHA-256 of the text file it was built from
+    and is only rebuilt when that hash changes or a GADDAG is requested but
+    missing. Words with letters that have no tiles are left out.
+    """
+    try:
+        words = open_compiled_dictionary(dict_file, gaddag, cache_file, verify)
+        if not len(words):
+            print("Error: Dictionary is empty.")
+            return None
+
+        return words
+
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {str(e)}")
+        return None
+    except Exception as e:
+        print(f"An error occurred while loading the dictionary: {str(e)}")
+        return None
+
+def open_compiled_dictionary(dict_file: str, gaddag: bool = False,
+                             cache_file: Optional[str] = None, verify: bool = True) -> Dawg:
+    """
+    Like load_compiled_dictionary, but raise on errors and return an empty Dawg as is.
+    
+    Raises:
+        FileNotFoundError: The dictionary file does not exist
+        ValueError: The dictionary file is not valid UTF-8
+        OSError: The dictionary or compiled file cannot be read or written
+    """
+    if cache_file is None:
+        cache_file = dict_file + '.dawg'
+    if not os.path.exists(dict_file):
+        raise FileNotFoundError(f"File '{dict_file}' not found.")
+
+    try:
+        header = read_header(cache_file)
+        if (header is None or (gaddag and not header[4]) or
+                ((verify or os.path.getmtime(cache_file) < os.path.getmtime(dict_file)) and
+                 header[0] != source_digest(dict_file))):
+            compile_dictionary(dict_file, cache_file, gaddag)
+        try:
+            return Dawg.open(cache_file)
+        except ValueError:
+            # A damaged compiled file is rebuilt from the word list once
+            compile_dictionary(dict_file, cache_file, gaddag)
+            return Dawg.open(cache_file)
+    except UnicodeDecodeError:
+        raise ValueError(f"File '{dict_file}' has invalid encoding. Please use UTF-8.") from None
+
 def is_valid_word(word: str, dictionary: Set[str]) -> bool:
     """
     Check if a word is valid according to the dictionary.
     
     Args:
         word: Word to check
-        dictionary: Set of valid words
+        dictionary: Set of valid words, a Trie or a compiled Dawg
         
     Returns:
         True if word is in dictionary, False otherwise
     """
-    return word.lower() in dictionary
+    return word in dictionary
 
 def calculate_word_score(word: str, tile_system: TileSystem) -> int:
     """